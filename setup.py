@@ -72,6 +72,8 @@ setup(
         'click >= 6.7, < 7.0',
 
         "backports.csv ; python_version<'3.6'",
+        "scandir ; python_version<'3'",
+        "futures ; python_version<'3'",
 
         # required by saneyaml
         'PyYAML >= 3.11, <=3.13',
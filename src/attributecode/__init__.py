@@ -19,6 +19,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import namedtuple
+from collections import OrderedDict
 import logging
 import os
 
@@ -49,11 +50,33 @@ limitations under the License.
 """
 
 
-class Error(namedtuple('Error', ['severity', 'message'])):
+class Error(namedtuple('Error', ['severity', 'message', 'code', 'path', 'field'])):
     """
     An Error data with a severity and message.
+    Errors are equal and hash the same if they have the same severity and
+    message.
+
+    An Error can also carry structured data that is not part of its equality:
+    an error `code` string such as "custom-field", the `path` of the ABOUT
+    file and the name of the `field` this Error is about.
     """
-    def __new__(self, severity, message):
+    # no per-instance __dict__: there can be many Errors
+    __slots__ = ()
+
+    # An Error is iterated and unpacked as a (severity, message) tuple: the
+    # structured data is only available as attributes.
+
+    def __iter__(self):
+        return iter((self.severity, self.message))
+
+    def __len__(self):
+        return 2
+
+    def __getnewargs__(self):
+        # all the fields, including the structured data
+        return tuple(self[:5])
+
+    def __new__(self, severity, message, code=None, path=None, field=None):
         if message:
             if isinstance(message, unicode):
                 message = self._clean_string(message)
@@ -62,14 +85,26 @@ class Error(namedtuple('Error', ['severity', 'message'])):
                 message = message.strip('"')
 
         return super(Error, self).__new__(
-            Error, severity, message)
+            Error, severity, message, code, path, field)
 
     def __repr__(self, *args, **kwargs):
         sev, msg = self._get_values()
         return 'Error(%(sev)s,  %(msg)s)' % locals()
 
     def __eq__(self, other):
-        return repr(self) == repr(other)
+        return (isinstance(other, Error)
+                and self.severity == other.severity
+                and self.message == other.message)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        # the structured data may be None and is not compared
+        return (self.severity, self.message) < (other.severity, other.message)
+
+    def __hash__(self):
+        return hash((self.severity, self.message))
 
     def _get_values(self):
         sev = severities[self.severity]
@@ -86,6 +121,29 @@ class Error(namedtuple('Error', ['severity', 'message'])):
         """
         return self._asdict()
 
+    @property
+    def detail(self):
+        """
+        Return the message of this Error without its ABOUT file path prefix.
+        """
+        message = self.message or ''
+        prefix = (self.path or '') + ': '
+        if self.path and message.startswith(prefix):
+            return message[len(prefix):]
+        return message
+
+    def to_record(self):
+        """
+        Return an ordered dict of the structured data of this Error.
+        """
+        return OrderedDict([
+            ('severity', severities.get(self.severity) or 'UNKNOWN'),
+            ('code', self.code),
+            ('path', self.path),
+            ('field', self.field),
+            ('message', self.detail),
+        ])
+
     @staticmethod
     def _clean_string(s):
         """
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2013-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+"""
+On-disk caches of loaded and validated About objects and of file checksums.
+
+A cached About is reused only if the ABOUT file and all the files it references
+(such as the about_resource, license_file or notice_file) have the same
+identity (size, modification time and inode) as when it was cached. Cache
+entries are also tied to the AboutCode toolkit version.
+
+Cached checksums are reused only if the file has the same identity as when its
+checksums were computed.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from attributecode import __version__
+from attributecode import NOTSET
+from attributecode.util import add_unc
+from attributecode.util import to_posix
+
+
+def get_file_identity(location):
+    """
+    Return a tuple of (size, mtime in nanoseconds, inode) identifying the
+    current state of the file or directory at `location` or None if it does
+    not exist.
+    """
+    try:
+        stat = os.stat(add_unc(location))
+    except (OSError, IOError):
+        return None
+    mtime_ns = getattr(stat, 'st_mtime_ns', None)
+    if mtime_ns is None:
+        mtime_ns = int(stat.st_mtime * 1000000000)
+    return stat.st_size, mtime_ns, stat.st_ino
+
+
+def get_dependencies(about):
+    """
+    Return a list of (location, identity) for all the file locations
+    referenced from the path fields of an `about` About object.
+    """
+    from attributecode.model import PathField
+
+    dependencies = []
+    for field in about.all_fields():
+        if not isinstance(field, PathField):
+            continue
+        for location in field.resolved_paths:
+            dependencies.append((location, get_file_identity(location)))
+    return dependencies
+
+
+class AboutCache(object):
+    """
+    A cache of About objects stored as pickles in the `cache_dir` directory.
+    About objects loaded with a different `min_severity` have different errors
+    and are cached separately.
+    """
+
+    def __init__(self, cache_dir, min_severity=NOTSET):
+        self.cache_dir = cache_dir
+        self.min_severity = min_severity
+
+    def get_cache_key(self, location, about_file_path):
+        """
+        Return a cache key string for the ABOUT file at `location` with an
+        `about_file_path` or None if this file cannot be cached.
+        """
+        identity = get_file_identity(location)
+        if not identity:
+            return
+        key = repr((__version__, to_posix(location), about_file_path, identity,
+                    self.min_severity))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get_cache_location(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, location, about_file_path):
+        """
+        Return a cached About object for the ABOUT file at `location` with an
+        `about_file_path` or None if there is no valid cached About.
+        """
+        key = self.get_cache_key(location, about_file_path)
+        if not key:
+            return
+        cached = load_cache_entry(self.get_cache_location(key))
+        if cached is None:
+            return
+
+        dependencies, about = cached
+        for dep_location, identity in dependencies:
+            if get_file_identity(dep_location) != identity:
+                return
+        return about
+
+    def put(self, about):
+        """
+        Cache the `about` About object.
+        """
+        key = self.get_cache_key(about.location, about.about_file_path)
+        if not key:
+            return
+        save_cache_entry(self.get_cache_location(key),
+                         (get_dependencies(about), about))
+
+
+class ChecksumCache(object):
+    """
+    A cache of file checksums stored as pickles in the "checksums"
+    subdirectory of the `cache_dir` directory. If `cache_dir` is None, the
+    checksums are only cached in memory.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.checksums = {}
+
+    def get_cache_key(self, location):
+        """
+        Return a cache key string for the file at `location` or None if this
+        file cannot be cached.
+        """
+        identity = get_file_identity(location)
+        if not identity:
+            return
+        key = repr((to_posix(location), identity))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get_cache_location(self, key):
+        return os.path.join(self.cache_dir, 'checksums', key[:2], key)
+
+    def get_or_compute(self, location, compute):
+        """
+        Return the cached checksums of the file at `location` or compute,
+        cache and return them with the `compute` callable called with the
+        `location` as its single argument.
+        """
+        key = self.get_cache_key(location)
+        if not key:
+            return compute(location)
+
+        checksums = self.checksums.get(key)
+        if checksums is None and self.cache_dir:
+            checksums = load_cache_entry(self.get_cache_location(key))
+        if checksums is None:
+            checksums = compute(location)
+            if self.cache_dir:
+                save_cache_entry(self.get_cache_location(key), checksums)
+        self.checksums[key] = checksums
+        return checksums
+
+
+def load_cache_entry(cache_location):
+    """
+    Return the data cached at `cache_location` or None.
+    """
+    try:
+        with open(cache_location, 'rb') as cached:
+            return pickle.load(cached)
+    except Exception:
+        # missing, unreadable or stale cache entries are ignored
+        return
+
+
+def save_cache_entry(cache_location, data):
+    """
+    Cache `data` at `cache_location`.
+    """
+    cache_subdir = os.path.dirname(cache_location)
+    try:
+        if not os.path.exists(cache_subdir):
+            os.makedirs(cache_subdir)
+        # write to a temp file and rename it in place such that concurrent
+        # processes never read a partially written entry
+        fd, temp_location = tempfile.mkstemp(dir=cache_subdir)
+    except (OSError, IOError):
+        # caching is best effort only
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as cached:
+            pickle.dump(data, cached, protocol=pickle.HIGHEST_PROTOCOL)
+        if os.path.exists(cache_location):
+            os.remove(cache_location)
+        os.rename(temp_location, cache_location)
+    except (OSError, IOError):
+        if os.path.exists(temp_location):
+            os.remove(temp_location)
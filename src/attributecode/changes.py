@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2013-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+"""
+Selection of the ABOUT files affected by the changes made in a git work tree
+since a git revision: the ABOUT files that changed and the ABOUT files that
+reference a changed file such as their about_resource or license_file.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import posixpath
+import subprocess
+
+from attributecode import CRITICAL
+from attributecode import Error
+from attributecode.util import add_unc
+from attributecode.util import bounded_map
+from attributecode.util import to_posix
+
+
+class GitError(Exception):
+    pass
+
+
+def run_git(directory, *args):
+    """
+    Run git with `args` in `directory` and return its output as a unicode
+    string. Raise a GitError on failure.
+    """
+    try:
+        process = subprocess.Popen(
+            ['git'] + list(args),
+            cwd=directory,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = process.communicate()
+    except OSError as e:
+        raise GitError('Cannot run git: %(e)r' % locals())
+    if process.returncode:
+        stderr = stderr.decode('utf-8', 'replace').strip()
+        raise GitError(stderr)
+    return stdout.decode('utf-8', 'replace')
+
+
+def get_changed_locations(location, ref):
+    """
+    Return a set of absolute posix locations of the files changed since the
+    git `ref` revision in the git work tree that contains `location`. Include
+    the committed, staged, unstaged and deleted files, both the old and new
+    paths of renamed files and the untracked files that are not ignored. Raise
+a GitError on failure or if `ref` starts with a dash.
+    """
+    if ref.startswith('-'):
+        # a ref would otherwise be parsed as a git diff option
+        raise GitError('Invalid git revision: %(ref)r' % locals())
+    directory = location if os.path.isdir(location) else os.path.dirname(location)
+    directory = os.path.abspath(directory)
+    top = run_git(directory, 'rev-parse', '--show-toplevel').strip()
+    # these paths are relative to the top of the work tree
+    # without rename detection, a renamed file is listed with its old path too
+    changed = run_git(
+        directory, 'diff', '--name-only', '--no-renames', '-z', ref, '--').split('\0')
+    untracked = run_git(
+        directory, 'ls-files', '--others', '--exclude-standard', '--full-name', '-z')
+    changed.extend(untracked.split('\0'))
+
+    # git reports real paths: map these back to the paths under `directory`
+    real_directory = os.path.realpath(directory)
+    locations = set()
+    for path in changed:
+        if not path:
+            continue
+        real_location = os.path.join(top, path)
+        relative = os.path.relpath(real_location, real_directory)
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            continue
+        locations.add(to_posix(os.path.normpath(os.path.join(directory, relative))))
+    return locations
+
+
+def get_referenced_locations(about_location):
+    """
+    Return a list of absolute posix locations of the files referenced by the
+    path fields (such as about_resource or license_file) of the ABOUT file at
+    `about_location`. Return an empty list if this file cannot be loaded.
+    """
+    from attributecode.model import About
+    from attributecode.model import parse_about_text
+
+    try:
+        with io.open(add_unc(about_location), encoding='utf-8') as txt:
+            data = parse_about_text(txt.read())
+    except Exception:
+        # invalid ABOUT files are reported when they are checked
+        return []
+    if not isinstance(data, dict):
+        return []
+
+    values = [data.get(name) for name in About.schema.file_fields]
+    licenses = data.get('licenses')
+    if isinstance(licenses, list):
+        values.extend(lic.get('file') for lic in licenses if isinstance(lic, dict))
+
+    base_dir = posixpath.dirname(to_posix(about_location))
+    locations = []
+    for value in values:
+        if not value:
+            continue
+        if not isinstance(value, list):
+            value = [value]
+        for item in value:
+            for path in ('%s' % item).split(','):
+                path = to_posix(path.strip()).strip(posixpath.sep)
+                if not path:
+                    continue
+                locations.append(posixpath.normpath(posixpath.join(base_dir, path)))
+    return locations
+
+
+def get_referenced_locations_in_chunk(about_locations):
+    """
+    Return a list of the get_referenced_locations() lists for each of the
+    `about_locations` ABOUT file locations, for use in a process pool worker.
+    """
+    return [get_referenced_locations(location) for location in about_locations]
+
+
+def get_referenced_locations_in_pool(about_locations, jobs):
+    """
+    Yield the get_referenced_locations() lists for each of the
+    `about_locations` ABOUT file locations parsed in a pool of `jobs`
+    processes.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, min(64, len(about_locations) // (jobs * 4)))
+    chunks = (about_locations[i:i + chunksize]
+              for i in range(0, len(about_locations), chunksize))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for referenced in bounded_map(
+                executor, get_referenced_locations_in_chunk, chunks, jobs * 2):
+            for locations in referenced:
+                yield locations
+
+
+def may_reference_parent(about_location):
+    """
+    Return True if the ABOUT file at `about_location` may reference a path
+    outside of its own directory, e.g. with a "../" path segment.
+    """
+    try:
+        with io.open(add_unc(about_location), encoding='utf-8') as txt:
+            return '..' in txt.read()
+    except Exception:
+        # invalid ABOUT files are reported when they are checked
+        return False
+
+
+def select_changed_about_locations(about_locations, changed_locations, jobs=1):
+    """
+    Return a list of the `about_locations` ABOUT file locations that are in the
+    `changed_locations` set of absolute posix locations or that reference a
+    changed file or a directory that contains a changed file.
+
+    ABOUT files are parsed only if they may reference a changed file: their
+    own directory contains a changed file or they reference a path outside of
+    their directory. The ABOUT file named after a changed resource is selected
+    without parsing. If `jobs` is more than one, ABOUT files are parsed in a
+    pool of `jobs` processes.
+    """
+    changed_dirs = set()
+    for location in changed_locations:
+        parent = posixpath.dirname(location)
+        while parent and parent not in changed_dirs:
+            changed_dirs.add(parent)
+            grand_parent = posixpath.dirname(parent)
+            if grand_parent == parent:
+                break
+            parent = grand_parent
+
+    selected = set()
+    candidates = []
+    for about_location in about_locations:
+        normalized = posixpath.normpath(to_posix(about_location))
+        # the <resource>.ABOUT file of a changed resource
+        resource = normalized[:-len('.ABOUT')]
+        if (normalized in changed_locations
+                or resource in changed_locations or resource in changed_dirs):
+            selected.add(about_location)
+        elif (posixpath.dirname(normalized) in changed_dirs
+                or may_reference_parent(about_location)):
+            candidates.append(about_location)
+
+    if not jobs or jobs <= 1 or len(candidates) <= 1:
+        referenced = (get_referenced_locations(loc) for loc in candidates)
+    else:
+        referenced = get_referenced_locations_in_pool(candidates, jobs)
+
+    for about_location, locations in zip(candidates, referenced):
+        for location in locations:
+            if location in changed_locations or location in changed_dirs:
+                selected.add(about_location)
+                break
+    return [loc for loc in about_locations if loc in selected]
+
+
+def filter_changed_about_locations(location, about_locations, ref, jobs=1):
+    """
+    Return a tuple of (list of ABOUT file locations, list of errors) with the
+    `about_locations` ABOUT files found at `location` that are affected by the
+    changes since the git `ref` revision. All the `about_locations` are
+    returned with an error if the changes cannot be collected with git. Use
+    `jobs` processes to parse ABOUT files if more than one.
+    """
+    try:
+        changed_locations = get_changed_locations(location, ref)
+    except GitError as e:
+        msg = (u'Cannot collect the files changed since %(ref)r with git: '
+               u'%(e)s. Checking all ABOUT files.' % locals())
+        return about_locations, [Error(CRITICAL, msg, code='git-error')]
+    selected = select_changed_about_locations(about_locations, changed_locations, jobs)
+    return selected, []
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2013-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+"""
+Verification of the checksum_md5, checksum_sha1 and checksum_sha256 fields of
+ABOUT files against the files of their about_resource.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import hashlib
+import os
+
+from attributecode import ERROR
+from attributecode import Error
+from attributecode import WARNING
+from attributecode.util import add_unc
+from attributecode.util import bounded_map
+
+
+# read files in large chunks: hashlib releases the GIL on large updates such
+# that files are hashed in parallel in a thread pool
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# map of checksum field name to hashlib algorithm name
+CHECKSUM_FIELDS = OrderedDict([
+    ('checksum_md5', 'md5'),
+    ('checksum_sha1', 'sha1'),
+    ('checksum_sha256', 'sha256'),
+])
+
+
+def multi_checksums(location, chunk_size=CHUNK_SIZE):
+    """
+    Return a mapping of {algorithm name: hex digest} for the md5, sha1 and
+    sha256 checksums of the file at `location` computed in a single read.
+    """
+    hashers = [(name, hashlib.new(name)) for name in CHECKSUM_FIELDS.values()]
+    with open(add_unc(location), 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            for _name, hasher in hashers:
+                hasher.update(chunk)
+    return dict((name, hasher.hexdigest()) for name, hasher in hashers)
+
+
+def get_expected_checksums(about):
+    """
+    Return a tuple of (about_file_path, list of (field name, expected checksum),
+    list of (about_resource path, location or None if not found)) for an
+    `about` About object or None if it has no checksum to verify.
+    """
+    expected = []
+    for field_name in CHECKSUM_FIELDS:
+        field = getattr(about, field_name)
+        if field.present and field.value:
+            expected.append((field_name, field.value.strip().lower()))
+    if not expected:
+        return
+
+    resources = about.about_resource.value or {}
+    return about.about_file_path, expected, list(resources.items())
+
+
+def verify(expected_checksums, cache=None):
+    """
+    Return a list of errors for the `expected_checksums` tuple returned by
+    get_expected_checksums(), including a warning for each checksum that
+    cannot be verified. Use the `cache` ChecksumCache if provided.
+    """
+    about_file_path, expected, locations = expected_checksums
+    errors = []
+    for path, location in locations or [(None, None)]:
+        # a checksum that was not verified must not go unnoticed
+        if not path:
+            reason = u'there is no about_resource'
+        elif not location:
+            reason = u'about_resource %(path)s not found' % locals()
+        elif os.path.isdir(location):
+            reason = u'about_resource %(path)s is a directory' % locals()
+        else:
+            reason = None
+        if reason:
+            msg = (u'%(about_file_path)s: Cannot verify checksums: %(reason)s'
+                   % locals())
+            errors.append(Error(WARNING, msg, code='checksum-not-verified',
+                                path=about_file_path, field='about_resource'))
+            continue
+
+        try:
+            if cache is not None:
+                checksums = cache.get_or_compute(location, multi_checksums)
+            else:
+                checksums = multi_checksums(location)
+        except (OSError, IOError) as e:
+            msg = (u'%(about_file_path)s: Cannot compute checksums of: '
+                   u'%(location)s: %(e)r' % locals())
+            errors.append(Error(ERROR, msg, code='checksum-error',
+                                path=about_file_path, field='about_resource'))
+            continue
+
+        for field_name, value in expected:
+            actual = checksums[CHECKSUM_FIELDS[field_name]]
+            if actual != value:
+                msg = (u'%(about_file_path)s: Field %(field_name)s: Checksum '
+                       u'mismatch for %(location)s: expected %(value)s but '
+                       u'got %(actual)s' % locals())
+                errors.append(Error(ERROR, msg, code='checksum-mismatch',
+                                    path=about_file_path, field=field_name))
+    return errors
+
+
+def verify_checksums(abouts, workers=4, cache=None):
+    """
+    Yield lists of errors for the checksum fields of an iterable of `abouts`
+    About objects that do not match the checksums of their about_resource.
+
+    Files are hashed in a pool of `workers` threads and lists of errors are
+    yielded in the order of the `abouts`. Use the `cache` ChecksumCache if
+    provided.
+    """
+    expected = (get_expected_checksums(about) for about in abouts)
+    expected = (exp for exp in expected if exp)
+
+    if not workers or workers <= 1:
+        for exp in expected:
+            yield verify(exp, cache)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # only consume the `abouts` as checksums are verified
+        verified = bounded_map(executor, lambda exp: verify(exp, cache),
+                               expected, workers * 2)
+        for errors in verified:
+            yield errors
@@ -18,9 +18,12 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import Counter
 from collections import defaultdict
+from collections import OrderedDict
 from functools import partial
 import io
+import json
 import logging
 import os
 import sys
@@ -29,20 +32,29 @@ import click
 # silence unicode literals warnings
 click.disable_unicode_literals_warning = True
 
+from attributecode import NOTSET
 from attributecode import WARNING
 from attributecode.util import unique
 
 from attributecode import __about_spec_version__
 from attributecode import __version__
+from attributecode import model
 from attributecode import severities
 from attributecode.attrib import check_template
 from attributecode.attrib import DEFAULT_TEMPLATE_FILE
 from attributecode.attrib import generate_and_save as generate_attribution_doc
-from attributecode.gen import generate as generate_about_files
+from attributecode.database import is_sqlite_file
+from attributecode.database import load_abouts as load_sqlite_abouts
+from attributecode.database import save_errors_to_sqlite
+from attributecode.gen import iter_generate as iter_generate_about_files
 from attributecode.model import collect_inventory
+from attributecode.model import count_suppressed_errors
+from attributecode.model import iter_inventory
 from attributecode.model import write_output
+from attributecode.util import ErrorSummary
 from attributecode.util import extract_zip
 from attributecode.util import filter_errors
+from attributecode.util import strip_compression
 
 
 __copyright__ = """
@@ -99,6 +111,9 @@ Read, write and collect provenance and license inventories from .ABOUT files to
 
 Use about <command> --help for help on a command.
     """
+    # each run loads the license and notice texts in its own store
+    model.file_texts = model.TextStore()
+    click.get_current_context().call_on_close(model.file_texts.clear)
 
 
 ######################################################################
@@ -125,7 +140,8 @@ def validate_key_values(ctx, param, value):
 def validate_extensions(ctx, param, value, extensions=tuple(('.csv', '.json',))):
     if not value:
         return
-    if not value.endswith(extensions):
+    # compressed files such as inventory.csv.gz are accepted
+    if not strip_compression(value).endswith(extensions):
         msg = ' '.join(extensions)
         raise click.UsageError(
             'Invalid {param} file extension: must be one of: {msg}'.format(**locals()))
@@ -154,8 +170,30 @@ def validate_extensions(ctx, param, value, extensions=tuple(('.csv', '.json',)))
     is_flag=False,
     default='csv',
     show_default=True,
-    type=click.Choice(['json', 'csv']),
-    help='Set OUTPUT inventory file format.')
+    type=click.Choice(['json', 'jsonl', 'csv', 'sqlite']),
+    help='Set OUTPUT inventory file format. jsonl is JSON Lines with one JSON '
+         'object per line. sqlite is an SQLite database usable as input to the '
+         'gen and attrib commands.')
+
+@click.option('-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar='N',
+    help='Use N processes to load and validate .ABOUT files in parallel.')
+
+@click.option('--cache-dir',
+    metavar='DIR',
+    type=click.Path(file_okay=False, writable=True, resolve_path=True),
+    help='Cache loaded .ABOUT files in DIR (such as ~/.cache/aboutcode) and '
+         'reuse them when these files and the files they reference are unchanged.')
+
+@click.option('--errors-format',
+    default='text',
+    show_default=True,
+    type=click.Choice(['text', 'summary', 'jsonl']),
+    help='Set the format of error messages. summary reports groups of similar '
+         'errors with their count. jsonl reports one JSON object per error.')
 
 @click.option('-q', '--quiet',
     is_flag=True,
@@ -167,13 +205,14 @@ def validate_extensions(ctx, param, value, extensions=tuple(('.csv', '.json',)))
 
 @click.help_option('-h', '--help')
 
-def inventory(location, output, format, quiet, verbose):  # NOQA
+def inventory(location, output, format, jobs, cache_dir, errors_format, quiet, verbose):  # NOQA
     """
 Collect the inventory of .ABOUT file data as CSV or JSON.
 
 LOCATION: Path to an .ABOUT file or a directory with .ABOUT files.
 
-OUTPUT: Path to the JSON or CSV inventory file to create.
+OUTPUT: Path to the JSON, CSV or SQLite inventory file to create. JSON and
+CSV files with a .gz, .bz2 or .xz extension are compressed.
     """
     if not quiet:
         print_version()
@@ -182,10 +221,24 @@ OUTPUT: Path to the JSON or CSV inventory file to create.
     if location.lower().endswith('.zip'):
         # accept zipped ABOUT files as input
         location = extract_zip(location)
-    errors, abouts = collect_inventory(location)
-    write_errors = write_output(abouts=abouts, location=output, format=format)
+    errors = get_errors_collector(errors_format)
+    suppressed_errors = Counter()
+    min_severity = get_min_severity(verbose)
+
+    def abouts():
+        for about, about_errors in iter_inventory(location, jobs, cache_dir, min_severity):
+            errors.extend(about_errors)
+            if about is not None:
+                suppressed_errors.update(about.suppressed_errors)
+                yield about
+
+    write_errors = write_output(abouts=abouts(), location=output, format=format)
     errors.extend(write_errors)
-    errors_count = report_errors(errors, quiet, verbose, log_file_loc=output + '-error.log')
+    if format == 'sqlite' and not write_errors:
+        save_errors_to_sqlite(output, errors)
+    errors_count = report_errors(errors, quiet, verbose, log_file_loc=output + '-error.log',
+                                 suppressed_errors=suppressed_errors,
+                                 errors_format=errors_format)
     if not quiet:
         msg = 'Inventory collected in {output}.'.format(**locals())
         click.echo(msg)
@@ -237,7 +290,8 @@ def gen(location, output, fetch_license, reference, quiet, verbose):
     """
 Generate .ABOUT files in OUTPUT from an inventory of .ABOUT files at LOCATION.
 
-LOCATION: Path to a JSON or CSV inventory file.
+LOCATION: Path to a JSON, CSV or SQLite inventory file. JSON and CSV files
+can be compressed with a .gz, .bz2 or .xz extension.
 
 OUTPUT: Path to a directory where ABOUT files are generated.
     """
@@ -245,19 +299,28 @@ OUTPUT: Path to a directory where ABOUT files are generated.
         print_version()
         click.echo('Generating .ABOUT files...')
 
-    if not location.endswith(('.csv', '.json',)):
-        raise click.UsageError('ERROR: Invalid input file extension: must be one .csv or .json.')
+    if (not strip_compression(location).endswith(('.csv', '.json',))
+            and not is_sqlite_file(location)):
+        raise click.UsageError(
+            'ERROR: Invalid input file extension: must be one .csv or .json '
+            'or an SQLite inventory.')
 
-    errors, abouts = generate_about_files(
+    errors = []
+    abouts_count = 0
+    # each ABOUT file is written as its inventory row is read
+    generated = iter_generate_about_files(
         location=location,
         base_dir=output,
         reference_dir=reference,
         fetch_license=fetch_license,
     )
+    for about, about_errors in generated:
+        errors.extend(about_errors)
+        if about is not None:
+            abouts_count += 1
 
     errors_count = report_errors(errors, quiet, verbose, log_file_loc=output + '-error.log')
     if not quiet:
-        abouts_count = len(abouts)
         msg = '{abouts_count} .ABOUT files generated in {output}.'.format(**locals())
         click.echo(msg)
     sys.exit(errors_count)
@@ -309,6 +372,26 @@ def validate_template(ctx, param, value):
     metavar='<key>=<value>',
     help='Add variable text as key=value for use in a custom attribution template.')
 
+@click.option('-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar='N',
+    help='Use N processes to load and validate .ABOUT files in parallel.')
+
+@click.option('--cache-dir',
+    metavar='DIR',
+    type=click.Path(file_okay=False, writable=True, resolve_path=True),
+    help='Cache loaded .ABOUT files in DIR (such as ~/.cache/aboutcode) and '
+         'reuse them when these files and the files they reference are unchanged.')
+
+@click.option('--errors-format',
+    default='text',
+    show_default=True,
+    type=click.Choice(['text', 'summary', 'jsonl']),
+    help='Set the format of error messages. summary reports groups of similar '
+         'errors with their count. jsonl reports one JSON object per error.')
+
 @click.option('-q', '--quiet',
     is_flag=True,
     help='Do not print error or warning messages.')
@@ -319,11 +402,12 @@ def validate_template(ctx, param, value):
 
 @click.help_option('-h', '--help')
 
-def attrib(location, output, template, vartext, quiet, verbose):
+def attrib(location, output, template, vartext, jobs, cache_dir, errors_format, quiet, verbose):
     """
 Generate an attribution document at OUTPUT using .ABOUT files at LOCATION.
 
-LOCATION: Path to a file, directory or .zip archive containing .ABOUT files.
+LOCATION: Path to a file, directory or .zip archive containing .ABOUT files
+or to an SQLite inventory file.
 
 OUTPUT: Path where to write the attribution document.
     """
@@ -335,7 +419,13 @@ OUTPUT: Path where to write the attribution document.
     if location.lower().endswith('.zip'):
         location = extract_zip(location)
 
-    errors, abouts = collect_inventory(location)
+    min_severity = get_min_severity(verbose)
+    if is_sqlite_file(location):
+        # accept an SQLite inventory as input
+        errors, abouts = load_sqlite_abouts(location, min_severity=min_severity)
+    else:
+        errors, abouts = collect_inventory(location, jobs=jobs, cache_dir=cache_dir,
+                                           min_severity=min_severity)
 
     attrib_errors = generate_attribution_doc(
         abouts=abouts,
@@ -345,7 +435,9 @@ OUTPUT: Path where to write the attribution document.
     )
     errors.extend(attrib_errors)
 
-    errors_count = report_errors(errors, quiet, verbose, log_file_loc=output + '-error.log')
+    errors_count = report_errors(errors, quiet, verbose, log_file_loc=output + '-error.log',
+                                 suppressed_errors=count_suppressed_errors(abouts),
+                                 errors_format=errors_format)
 
     if not quiet:
         msg = 'Attribution generated in: {output}'.format(**locals())
@@ -369,13 +461,45 @@ OUTPUT: Path where to write the attribution document.
     type=click.Path(
         exists=True, file_okay=True, dir_okay=True, readable=True, resolve_path=True))
 
+@click.option('-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar='N',
+    help='Use N processes to load and validate .ABOUT files in parallel.')
+
+@click.option('--cache-dir',
+    metavar='DIR',
+    type=click.Path(file_okay=False, writable=True, resolve_path=True),
+    help='Cache loaded .ABOUT files in DIR (such as ~/.cache/aboutcode) and '
+         'reuse them when these files and the files they reference are unchanged.')
+
+@click.option('--errors-format',
+    default='text',
+    show_default=True,
+    type=click.Choice(['text', 'summary', 'jsonl']),
+    help='Set the format of error messages. summary reports groups of similar '
+         'errors with their count. jsonl reports one JSON object per error.')
+
+@click.option('--changed-since',
+    metavar='REF',
+    help='Only check the .ABOUT files changed since the REF git revision and '
+         'the .ABOUT files that reference a changed file.')
+
+@click.option('--verify-checksums',
+    is_flag=True,
+    help='Verify that the checksum_md5, checksum_sha1 and checksum_sha256 '
+         'fields match the about_resource files. Files are hashed in parallel '
+         'threads and their checksums are cached in the --cache-dir if provided.')
+
 @click.option('--verbose',
     is_flag=True,
     help='Show all error and warning messages.')
 
 @click.help_option('-h', '--help')
 
-def check(location, verbose):
+def check(location, jobs, cache_dir, errors_format, changed_since, verify_checksums,
+          verbose):
     """
 Check .ABOUT file(s) at LOCATION for validity and print error messages.
 
@@ -383,8 +507,30 @@ LOCATION: Path to a file or directory containing .ABOUT files.
     """
     print_version()
     click.echo('Checking ABOUT files...')
-    errors, _abouts = collect_inventory(location)
-    severe_errors_count = report_errors(errors, quiet=False, verbose=verbose)
+    errors = get_errors_collector(errors_format)
+    min_severity = get_min_severity(verbose)
+
+    # do not keep the About objects around: only their errors are needed
+    def abouts():
+        inventory = iter_inventory(location, jobs, cache_dir, min_severity, changed_since)
+        for about, about_errors in inventory:
+            errors.extend(about_errors)
+            if about is not None:
+                yield about
+
+    if verify_checksums:
+        from attributecode.cache import ChecksumCache
+        from attributecode.checksum import verify_checksums as verify
+        checksum_errors = verify(abouts(), workers=max(jobs, 4),
+                                 cache=ChecksumCache(cache_dir))
+        for about_checksum_errors in checksum_errors:
+            errors.extend(about_checksum_errors)
+    else:
+        for _about in abouts():
+            pass
+
+    severe_errors_count = report_errors(errors, quiet=False, verbose=verbose,
+                                        errors_format=errors_format)
     sys.exit(severe_errors_count)
 
 
@@ -444,6 +590,8 @@ and write a new CSV to OUTPUT.
 LOCATION: Path to a CSV file.
 
 OUTPUT: Path to CSV inventory file to create.
+
+CSV files with a .gz, .bz2 or .xz extension are decompressed or compressed.
     """
     from attributecode.transform import transform_csv_to_csv
     from attributecode.transform import Transformer
@@ -470,21 +618,58 @@ OUTPUT: Path to CSV inventory file to create.
 # Error management
 ######################################################################
 
-def report_errors(errors, quiet, verbose, log_file_loc=None):
+def get_min_severity(verbose):
+    """
+    Return the minimum severity of the errors to create when loading ABOUT
+    files given the `verbose` flag. Errors that would never be reported
+    are only counted.
+    """
+    return NOTSET if verbose else WARNING
+
+
+def get_errors_collector(errors_format='text'):
+    """
+    Return an empty list-like object to collect Error objects for an
+    `errors_format`. The summary format only keeps counted groups of errors.
+    """
+    if errors_format == 'summary':
+        return ErrorSummary()
+    return []
+
+
+def report_errors(errors, quiet, verbose, log_file_loc=None, suppressed_errors=None,
+                  errors_format='text'):
     """
-    Report the `errors` list of Error objects to screen based on the `quiet` and
-    `verbose` flags.
+    Report the `errors` list of Error objects or ErrorSummary to screen based on
+    the `quiet` and `verbose` flags.
 
     If `log_file_loc` file location is provided also write a verbose log to this
-    file.
+    file. The `suppressed_errors` mapping of {severity: count} of errors that
+    were only counted is summarized in this log.
+
+    The `errors_format` is one of "text" for one message per error, "summary"
+    for one message per group of similar errors or "jsonl" for one JSON object
+    per error.
     Return True if there were severe error reported.
     """
-    errors = unique(errors)
-    messages, severe_errors_count = get_error_messages(errors, quiet, verbose)
+    if errors_format == 'summary':
+        if not isinstance(errors, ErrorSummary):
+            errors = ErrorSummary(unique(errors))
+        get_messages = get_summary_messages
+    else:
+        errors = unique(errors)
+        if errors_format == 'jsonl':
+            get_messages = get_error_records
+        else:
+            get_messages = get_error_messages
+
+    messages, severe_errors_count = get_messages(errors, quiet, verbose)
     for msg in messages:
         click.echo(msg)
     if log_file_loc:
-        log_msgs, _ = get_error_messages(errors, quiet=False, verbose=True)
+        log_msgs, _ = get_messages(errors, quiet=False, verbose=True)
+        log_msgs.extend(get_suppressed_messages(
+            suppressed_errors, as_json=errors_format == 'jsonl'))
         with io.open(log_file_loc, 'w', encoding='utf-8') as lf:
             lf.write('\n'.join(log_msgs))
     return severe_errors_count
@@ -506,7 +691,9 @@ def get_error_messages(errors, quiet=False, verbose=False):
         error_msg = 'Command completed with {} errors or warnings.'.format(severe_errors_count)
         messages.append(error_msg)
 
-    for severity, message in errors:
+    for error in errors:
+        severity = error.severity
+        message = error.message
         sevcode = severities.get(severity) or 'UNKNOWN'
         msg = '{sevcode}: {message}'.format(**locals())
         if not quiet:
@@ -516,6 +703,87 @@ def get_error_messages(errors, quiet=False, verbose=False):
                 messages .append(msg)
     return messages, severe_errors_count
 
+
+def get_summary_messages(summary, quiet=False, verbose=False):
+    """
+    Return a tuple of (list of error message strings to report,
+    severe_errors_count) given a `summary` ErrorSummary with one message per
+    group of similar errors and using the `quiet` and `verbose` flags.
+    """
+    severe_errors_count = summary.count(WARNING)
+
+    messages = []
+    if quiet:
+        return messages, severe_errors_count
+
+    if severe_errors_count:
+        error_msg = 'Command completed with {} errors or warnings.'.format(severe_errors_count)
+        messages.append(error_msg)
+
+    for error, count in summary:
+        if not verbose and error.severity < WARNING:
+            continue
+        sevcode = severities.get(error.severity) or 'UNKNOWN'
+        message = error.message
+        if count == 1:
+            msg = '{sevcode}: {message}'.format(**locals())
+        elif error.code:
+            group = ' '.join(g for g in (error.code, error.field) if g)
+            msg = ('{sevcode}: {group}: {count} occurrences, such as: '
+                   '{message}'.format(**locals()))
+        else:
+            detail = error.detail
+            msg = '{sevcode}: {detail}: {count} occurrences'.format(**locals())
+        messages.append(msg)
+    return messages, severe_errors_count
+
+
+def get_error_records(errors, quiet=False, verbose=False):
+    """
+    Return a tuple of (list of JSON strings to report, severe_errors_count)
+    given an `errors` list of Error objects with one JSON object per error and
+    using the `quiet` and `verbose` flags.
+    """
+    severe_errors_count = len(filter_errors(errors, WARNING))
+
+    records = []
+    if quiet:
+        return records, severe_errors_count
+
+    for error in errors:
+        if not verbose and error.severity < WARNING:
+            continue
+        records.append(json.dumps(error.to_record()))
+    return records, severe_errors_count
+
+
+def get_suppressed_messages(suppressed_errors, as_json=False):
+    """
+    Return a list of message strings summarizing a `suppressed_errors` mapping
+    of {severity: count} of errors that were counted but not reported. Return
+    JSON strings if `as_json` is True.
+    """
+    messages = []
+    for severity, count in sorted((suppressed_errors or {}).items(), reverse=True):
+        if not count:
+            continue
+        sevcode = severities.get(severity) or 'UNKNOWN'
+        msg = ('{count} messages not reported. '
+               'Use --verbose to report them.'.format(**locals()))
+        if as_json:
+            record = OrderedDict([
+                ('severity', sevcode),
+                ('code', 'not-reported'),
+                ('path', None),
+                ('field', None),
+                ('message', msg),
+                ('count', count),
+            ])
+            messages.append(json.dumps(record))
+        else:
+            messages.append('{sevcode}: {msg}'.format(**locals()))
+    return messages
+
 ######################################################################
 # Misc
 ######################################################################
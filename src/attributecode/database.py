@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2013-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+"""
+An inventory stored in an SQLite database with these tables:
+
+- components: one row per ABOUT file with its about_file_path and location,
+  a few common fields as columns and all the fields as JSON. The `fields` JSON
+  has the original field values of the ABOUT file and is used to recreate an
+  About object. The `item` JSON is the same as an item of a JSON inventory.
+- licenses: one row per license of a component with the key, name, file and url.
+- errors: one row per error or group of errors with their count.
+
+The license and notice texts are not stored: they are loaded from the original
+location of the ABOUT files when needed.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+import io
+import json
+import os
+import posixpath
+import sqlite3
+
+from attributecode import __version__
+from attributecode import CRITICAL
+from attributecode import Error
+from attributecode import NOTSET
+from attributecode import util
+from attributecode.util import add_unc
+from attributecode.util import to_posix
+from attributecode.util import unique
+
+
+SCHEMA = '''
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE components (
+    id INTEGER PRIMARY KEY,
+    about_file_path TEXT NOT NULL,
+    location TEXT,
+    name TEXT,
+    version TEXT,
+    about_resource TEXT,
+    license_expression TEXT,
+    fields TEXT NOT NULL,
+    item TEXT
+);
+
+CREATE TABLE licenses (
+    component_id INTEGER NOT NULL REFERENCES components (id),
+    key TEXT,
+    name TEXT,
+    file TEXT,
+    url TEXT
+);
+
+CREATE TABLE errors (
+    severity INTEGER NOT NULL,
+    code TEXT,
+    path TEXT,
+    field TEXT,
+    message TEXT,
+    count INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE INDEX components_about_file_path ON components (about_file_path);
+CREATE INDEX components_name ON components (name);
+CREATE INDEX licenses_component_id ON licenses (component_id);
+CREATE INDEX licenses_key ON licenses (key);
+CREATE INDEX errors_path ON errors (path);
+'''
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def is_sqlite_file(location):
+    """
+    Return True if the file at `location` is an SQLite database.
+    """
+    try:
+        with io.open(add_unc(location), 'rb') as db:
+            return db.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except (OSError, IOError):
+        return False
+
+
+def get_fields(about):
+    """
+    Return a list of (name, original value) for the present fields of an
+    `about` About object in the order they were loaded.
+    """
+    fields = about.fields.created_values() + list(about.custom_fields.values())
+    return [(field.name, field.original_value) for field in fields if field.present]
+
+
+def save_abouts_as_sqlite(location, abouts):
+    """
+    Write an SQLite inventory database at `location` given an iterable of About
+    objects, inserting rows as About objects are received. An existing file at
+    `location` is replaced. Return a list of errors.
+    """
+    from attributecode.model import get_json_item
+    from attributecode.model import get_licenses
+
+    if os.path.exists(location):
+        os.remove(location)
+
+    errors = []
+    conn = None
+    try:
+        conn = sqlite3.connect(location)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            'INSERT INTO metadata (key, value) VALUES (?, ?)',
+            [('aboutcode_toolkit_version', __version__)])
+        for about in abouts:
+            item = get_json_item(about)
+            cursor = conn.execute(
+                'INSERT INTO components (about_file_path, location, name, '
+                'version, about_resource, license_expression, fields, item) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+                    about.about_file_path,
+                    about.location and to_posix(about.location),
+                    about.name.value or None,
+                    about.version.value or None,
+                    item and item['about_resource'],
+                    about.license_expression.value or None,
+                    json.dumps(get_fields(about)),
+                    item and json.dumps(item),
+                ))
+            component_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO licenses (component_id, key, name, file, url) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(component_id,) + lic for lic in get_licenses(about)])
+        conn.commit()
+    except (sqlite3.Error, OSError, IOError) as e:
+        msg = u'Cannot write SQLite inventory at: %(location)s: %(e)r' % locals()
+        errors.append(Error(CRITICAL, msg, code='output-error'))
+    finally:
+        if conn is not None:
+            conn.close()
+    return errors
+
+
+def save_errors_to_sqlite(location, errors):
+    """
+    Insert `errors` in the errors table of the SQLite inventory database at
+    `location`. `errors` is a list of Error objects or an ErrorSummary.
+    """
+    if isinstance(errors, util.ErrorSummary):
+        errors_and_counts = list(errors)
+    else:
+        errors_and_counts = [(error, 1) for error in unique(errors)]
+
+    conn = sqlite3.connect(location)
+    try:
+        conn.executemany(
+            'INSERT INTO errors (severity, code, path, field, message, count) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [(error.severity, error.code, error.path, error.field, error.message, count)
+             for error, count in errors_and_counts])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_inventory_items(location):
+    """
+    Return a list of inventory item dicts from the SQLite inventory database
+    at `location`. These are the same as the rows of a CSV inventory of the
+    same ABOUT files: the original field values of each component with lists
+    as one value per line, an about_resource that is a path from the
+    inventory root first, then the standard fields in the standard order and
+    the custom fields sorted by name. Components without an about_resource
+    are skipped.
+    """
+    from attributecode.model import About
+
+    standard_names = About.schema.names
+    conn = sqlite3.connect(location)
+    try:
+        rows = conn.execute(
+            'SELECT about_resource, fields FROM components ORDER BY id')
+        items = []
+        for about_resource, fields in rows:
+            # the stored original about_resource is relative to the ABOUT file
+            if not about_resource:
+                continue
+            fields = dict(json.loads(fields))
+            names = [name for name in standard_names if name in fields]
+            names.extend(sorted(name for name in fields if name not in standard_names))
+            item = OrderedDict([('about_resource', about_resource)])
+            for name in names:
+                value = fields[name]
+                if name == 'about_resource' or not value:
+                    continue
+                # lists are one value per line as in a CSV inventory
+                if isinstance(value, list):
+                    value = '\n'.join(value)
+                item[name] = value
+            items.append(item)
+        return items
+    finally:
+        conn.close()
+
+
+def load_abouts(location, min_severity=NOTSET):
+    """
+    Return a tuple of (list of errors, list of About objects) loaded from the
+    SQLite inventory database at `location`. About objects are recreated from
+    their stored fields without reading their ABOUT files and validated against
+    their original location. Errors below `min_severity` are only counted.
+    """
+    from attributecode.model import About
+
+    errors = []
+    abouts = []
+    conn = sqlite3.connect(location)
+    try:
+        rows = conn.execute(
+            'SELECT about_file_path, location, fields FROM components ORDER BY id')
+        for about_file_path, about_location, fields in rows:
+            about = About(about_file_path=about_file_path)
+            about.location = about_location
+            base_dir = about_location and posixpath.dirname(about_location)
+            error_filter = util.ErrorFilter(min_severity)
+            fields = OrderedDict(json.loads(fields))
+            about_errors = about.load_dict(
+                fields, base_dir, running_inventory=True, error_filter=error_filter)
+            about.suppressed_errors = dict(error_filter.suppressed)
+            for error in about_errors:
+                msg = about_file_path + ': ' + error.message
+                errors.append(Error(error.severity, msg, code=error.code,
+                                    path=about_file_path, field=error.field))
+            abouts.append(about)
+    finally:
+        conn.close()
+    return unique(errors), abouts
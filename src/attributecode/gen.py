@@ -18,7 +18,6 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import codecs
 from collections import OrderedDict
 
 # FIXME: why posipath???
@@ -34,26 +33,20 @@ from attributecode import INFO
 from attributecode import Error
 from attributecode import model
 from attributecode import util
+from attributecode.database import is_sqlite_file
+from attributecode.database import load_inventory_items
 from attributecode.util import add_unc
-from attributecode.util import csv
 from attributecode.util import file_fields
 from attributecode.util import to_posix
 from attributecode.util import UNC_PREFIX_POSIX
 from attributecode.util import unique
 
 
-def check_duplicated_columns(location):
+def check_duplicated_columns(columns):
     """
-    Return a list of errors for duplicated column names in a CSV file
-    at location.
+    Return a list of errors for duplicated column names ignoring case in a
+    `columns` list of CSV column names.
     """
-    location = add_unc(location)
-    # FIXME: why errors=ignore?
-    with codecs.open(location, 'rb', encoding='utf-8', errors='ignore') as csvfile:
-        reader = csv.reader(csvfile)
-        columns = next(reader)
-        columns = [col for col in columns]
-
     seen = set()
     dupes = OrderedDict()
     for col in columns:
@@ -79,144 +72,256 @@ def check_duplicated_columns(location):
     return unique(errors)
 
 
-def check_duplicated_about_resource(inventory_dict):
+def check_inventory(inventory, columns=None):
     """
-    Return a list of errors for duplicated about_resource in a CSV file at location.
+    Return a list of errors for the problems that prevent generating ABOUT
+    files from an iterable of `inventory` row mappings, checked in a single
+    pass: duplicated `columns` names if provided, missing required fields,
+    duplicated about_resource values and newlines in file fields.
     """
-    arp_list = []
     errors = []
-    for component in inventory_dict:
+    if columns:
+        errors.extend(check_duplicated_columns(columns))
+
+    required_fields = model.About.required_fields
+    # ordered set of the missing required field names
+    missing_fields = OrderedDict()
+    about_resources = set()
+    for component in inventory:
+        for name in required_fields:
+            if name not in component:
+                missing_fields[name] = True
+
+        about_resource = component.get('about_resource')
         # Ignore all the empty path
-        if component['about_resource']:
-            if component['about_resource'] in arp_list:
+        if about_resource:
+            if about_resource in about_resources:
                 msg = ("The input has duplicated values in 'about_resource' "
-                       "field: " + component['about_resource'])
+                       "field: " + about_resource)
                 errors.append(Error(CRITICAL, msg))
             else:
-                arp_list.append(component['about_resource'])
+                about_resources.add(about_resource)
+
+        for name in file_fields:
+            value = component.get(name)
+            try:
+                has_newline = value and '\n' in value
+            except TypeError:
+                # not a string such as a number in a JSON inventory
+                has_newline = False
+            if has_newline:
+                msg = ("New line character detected in '%s' for '%s' which is not supported."
+                       "\nPlease use ',' to declare multiple files.") % (name, about_resource)
+                errors.append(Error(CRITICAL, msg))
+
+    for name in missing_fields:
+        msg = "Required field: %(name)r not found in the <input>" % locals()
+        errors.append(Error(ERROR, msg))
     return errors
 
 
-def check_newline_in_file_field(inventory_dict):
+def get_inventory(location):
     """
-    Return a list of errors for newline characters detected in *_file fields.
+    Return a tuple of (list of errors, iterable of inventory rows) for the CSV,
+    JSON or SQLite inventory file at `location`. The rows of a CSV inventory
+    are read from the file each time they are iterated. Return no rows if the
+    inventory has problems that prevent generating ABOUT files.
     """
-    errors = []
-    for component in inventory_dict:
-        for k in component.keys():
-            if k in file_fields:
-                try:
-                    if '\n' in component[k]:
-                        msg = ("New line character detected in '%s' for '%s' which is not supported."
-                                "\nPlease use ',' to declare multiple files.") % (k, component['about_resource'])
-                        errors.append(Error(CRITICAL, msg))
-                except:
-                    pass
-    return errors
+    # FIXME: do not mix up CSV and JSON
+    if util.strip_compression(location).endswith('.csv'):
+        inventory = util.CsvRows(add_unc(location))
+        errors = check_inventory(inventory)
+        # the header is read and the text is decoded once the rows are iterated
+        errors = check_duplicated_columns(inventory.columns) + inventory.errors + errors
+    else:
+        if is_sqlite_file(location):
+            inventory = load_inventory_items(location)
+        else:
+            inventory = util.load_json(location)
+        # FIXME: this should not be done here.
+        errors = check_inventory(inventory)
+
+    if errors:
+        return unique(errors), []
+    return [], inventory
+
+
+def load_about(fields, base_dir, reference_dir=None):
+    """
+    Return a tuple of (About object or None, list of errors) for an inventory
+    row `fields` mapping of field names to values. The row is modified.
+    """
+    afp = fields.get(model.About.ABOUT_RESOURCE_ATTR)
+
+    # FIXME: this should not be a failure condition
+    if not afp or not afp.strip():
+        msg = 'Empty column: %(afp)r. Cannot generate .ABOUT file.' % locals()
+        return None, [Error(ERROR, msg)]
+
+    afp = util.to_posix(afp)
+    loc = join(base_dir, afp)
+    about = model.About(about_file_path=afp)
+    about.location = loc
+
+    # Update value for 'about_resource'
+    # keep only the filename or '.' if it's a directory
+    if 'about_resource' in fields:
+        updated_resource_value = u''
+        resource_path = fields['about_resource']
+        if resource_path.endswith(u'/'):
+            updated_resource_value = u'.'
+        else:
+            updated_resource_value = basename(resource_path)
+        fields['about_resource'] = updated_resource_value
+
+    errors = about.load_dict(
+        fields,
+        base_dir,
+        running_inventory=False,
+        reference_dir=reference_dir,
+    )
+    return about, errors
+
+
+def iter_load_inventory(location, base_dir, reference_dir=None):
+    """
+    Load the CSV, JSON or SQLite inventory file at `location` for ABOUT and
+    LICENSE files stored in the `base_dir` and yield tuples of (About object,
+    list of errors) one inventory row at a time such that the whole inventory
+    does not need to be kept in memory. CSV and JSON files can be compressed
+    with gzip, bzip2 or xz.
+
+    Errors that are not specific to a row (such as duplicated columns) are
+    yielded first as a (None, list of errors) tuple and no About is yielded.
+    The About is None for a row that cannot be loaded.
+
+    Optionally use `reference_dir` as the directory location of extra reference
+    license and notice files to reuse.
+    """
+    base_dir = util.to_posix(base_dir)
+    errors, inventory = get_inventory(location)
+    if errors:
+        yield None, errors
+        return
+
+    for fields in inventory:
+        yield load_about(fields, base_dir, reference_dir)
 
 
 # TODO: this should be either the CSV or the ABOUT files but not both???
 def load_inventory(location, base_dir, reference_dir=None):
     """
-    Load the inventory file at `location` for ABOUT and LICENSE files stored in
-    the `base_dir`. Return a list of errors and a list of About objects
-    validated against the `base_dir`.
+    Load the CSV, JSON or SQLite inventory file at `location` for ABOUT and
+    LICENSE files stored in the `base_dir`. Return a list of errors and a list
+    of About objects validated against the `base_dir`. CSV and JSON files can
+    be compressed with gzip, bzip2 or xz.
 
     Optionally use `reference_dir` as the directory location of extra reference
     license and notice files to reuse.
     """
     errors = []
     abouts = []
-    base_dir = util.to_posix(base_dir)
-    # FIXME: do not mix up CSV and JSON
-    if location.endswith('.csv'):
-        # FIXME: this should not be done here.
-        dup_cols_err = check_duplicated_columns(location)
-        if dup_cols_err:
-            errors.extend(dup_cols_err)
-            return errors, abouts
-        inventory = util.load_csv(location)
-    else:
-        inventory = util.load_json(location)
+    for about, about_errors in iter_load_inventory(location, base_dir, reference_dir):
+        errors.extend(about_errors)
+        if about is not None:
+            abouts.append(about)
+    return unique(errors), abouts
 
-    try:
-        # FIXME: this should not be done here.
-        dup_about_resource_err = check_duplicated_about_resource(inventory)
-        if dup_about_resource_err:
-            errors.extend(dup_about_resource_err)
-            return errors, abouts
-        newline_in_file = check_newline_in_file_field(inventory)
-        if newline_in_file:
-            errors.extend(newline_in_file)
-            return errors, abouts
-    except Exception as e:
-        # TODO: why catch ALL Exception
-        msg = "The essential field 'about_resource' is not found in the <input>"
-        errors.append(Error(CRITICAL, msg))
-        return errors, abouts
-
-    for i, fields in enumerate(inventory):
-        # check does the input contains the required fields
-        required_fields = model.About.required_fields
-
-        for f in required_fields:
-            if f not in fields:
-                msg = "Required field: %(f)r not found in the <input>" % locals()
-                errors.append(Error(ERROR, msg))
-                return errors, abouts
-        afp = fields.get(model.About.ABOUT_RESOURCE_ATTR)
-
-        # FIXME: this should not be a failure condition
-        if not afp or not afp.strip():
-            msg = 'Empty column: %(afp)r. Cannot generate .ABOUT file.' % locals()
+
+def update_about_resource(self):
+    pass
+
+
+def dump_about(about, bdir, license_dict=None):
+    """
+    Write the ABOUT file of an `about` About object loaded from an inventory
+    in the `bdir` base directory and return a list of errors. Also write its
+    LICENSE files using the `license_dict` fetched licenses if provided.
+    """
+    errors = []
+    if about.about_file_path.startswith('/'):
+        about.about_file_path = about.about_file_path.lstrip('/')
+    dump_loc = join(bdir, about.about_file_path.lstrip('/'))
+
+    # The following code is to check if there is any directory ends with spaces
+    split_path = about.about_file_path.split('/')
+    for segment in split_path:
+        if segment.endswith(' '):
+            msg = (u'File path : '
+                   u'%(dump_loc)s '
+                   u'contains directory name ends with spaces which is not '
+                   u'allowed. Generation skipped.' % locals())
             errors.append(Error(ERROR, msg))
-            continue
-        else:
-            afp = util.to_posix(afp)
-            loc = join(base_dir, afp)
-        about = model.About(about_file_path=afp)
-        about.location = loc
-
-        # Update value for 'about_resource'
-        # keep only the filename or '.' if it's a directory
-        if 'about_resource' in fields:
-            updated_resource_value = u''
-            resource_path = fields['about_resource']
-            if resource_path.endswith(u'/'):
-                updated_resource_value = u'.'
+            return errors
+
+    try:
+        # Generate value for 'about_resource' if it does not exist
+        if not about.about_resource.value:
+            about.about_resource.value = OrderedDict()
+            about_resource_value = ''
+            if about.about_file_path.endswith('/'):
+                about_resource_value = u'.'
             else:
-                updated_resource_value = basename(resource_path)
-            fields['about_resource'] = updated_resource_value
-
-        ld_errors = about.load_dict(
-            fields,
-            base_dir,
-            running_inventory=False,
-            reference_dir=reference_dir,
-        )
-        """
-        # 'about_resource' field will be generated during the process.
-        # No error need to be raise for the missing 'about_resource'.
-        for e in ld_errors:
-            if e.message == 'Field about_resource is required':
-                ld_errors.remove(e)
-        """
-        for e in ld_errors:
-            if not e in errors:
-                errors.extend(ld_errors)
-        abouts.append(about)
+                about_resource_value = basename(about.about_file_path)
+            about.about_resource.value[about_resource_value] = None
+            about.about_resource.present = True
+            # Check for the existence of the 'about_resource'
+            # If the input already have the 'about_resource' field, it will
+            # be validated when creating the about object
+            loc = util.to_posix(dump_loc)
+            about_file_loc = loc
+            path = join(dirname(util.to_posix(about_file_loc)), about_resource_value)
+            if not exists(path):
+                path = util.to_posix(path.strip(UNC_PREFIX_POSIX))
+                path = normpath(path)
+                msg = (u'Field about_resource: '
+                       u'%(path)s '
+                       u'does not exist' % locals())
+                errors.append(Error(INFO, msg))
+
+        if license_dict is not None:
+            # Write generated LICENSE file
+            license_key_name_context_url_list = about.dump_lic(dump_loc, license_dict)
+            if license_key_name_context_url_list:
+                # use value not "presence"
+                if not about.license_file.present:
+                    about.license_file.value = OrderedDict()
+                    for lic_key, lic_name, lic_context, lic_url in license_key_name_context_url_list:
+                        gen_license_name = lic_key + u'.LICENSE'
+                        about.license_file.value[gen_license_name] = lic_context
+                        about.license_file.present = True
+                        if not about.license_name.present:
+                            about.license_name.value.append(lic_name)
+                        if not about.license_url.present:
+                            about.license_url.value.append(lic_url)
+                    if about.license_url.value:
+                        about.license_url.present = True
+                    if about.license_name.value:
+                        about.license_name.present = True
+
+        about.dump(dump_loc)
 
-    return unique(errors), abouts
+    except Exception as e:
+        # only keep the first 100 char of the exception
+        # TODO: truncated errors are likely making diagnotics harder
+        emsg = repr(e)[:100]
+        msg = (u'Failed to write .ABOUT file at : '
+               u'%(dump_loc)s '
+               u'with error: %(emsg)s' % locals())
+        errors.append(Error(ERROR, msg))
+    return errors
 
-def update_about_resource(self):
-    pass
 
-def generate(location, base_dir, reference_dir=None, fetch_license=False):
+def iter_generate(location, base_dir, reference_dir=None, fetch_license=False):
     """
-    Load ABOUT data from a CSV inventory at `location`. Write ABOUT files to
-    base_dir. Return errors and about objects.
+    Load ABOUT data from a CSV, JSON or SQLite inventory at `location` and
+    write ABOUT files to `base_dir` one inventory row at a time. Yield tuples
+    of (About object, list of errors) as each ABOUT file is written such that
+    the whole inventory does not need to be kept in memory.
+
+    Errors that are not specific to a row are yielded as (None, list of
+    errors) tuples. See generate() for the arguments.
     """
-    not_exist_errors = []
     api_url = ''
     api_key = ''
     gen_license = False
@@ -231,97 +336,31 @@ def generate(location, base_dir, reference_dir=None, fetch_license=False):
     # TODO: WHY use posix??
     bdir = to_posix(base_dir)
 
-    errors, abouts = load_inventory(
-        location=location,
-        base_dir=bdir,
-        reference_dir=reference_dir
-    )
-
+    license_dict = None
     if gen_license:
+        # the licenses are fetched in a first pass over the inventory
+        abouts = (about for about, _errors in iter_load_inventory(location, bdir, reference_dir)
+                  if about is not None)
         license_dict, err = model.pre_process_and_fetch_license_dict(abouts, api_url, api_key)
         if err:
-            for e in err:
-                # Avoid having same error multiple times
-                if not e in errors:
-                    errors.append(e)
-
-    for about in abouts:
-        if about.about_file_path.startswith('/'):
-            about.about_file_path = about.about_file_path.lstrip('/')
-        dump_loc = join(bdir, about.about_file_path.lstrip('/'))
-
-        # The following code is to check if there is any directory ends with spaces
-        split_path = about.about_file_path.split('/')
-        dir_endswith_space = False
-        for segment in split_path:
-            if segment.endswith(' '):
-                msg = (u'File path : '
-                       u'%(dump_loc)s '
-                       u'contains directory name ends with spaces which is not '
-                       u'allowed. Generation skipped.' % locals())
-                errors.append(Error(ERROR, msg))
-                dir_endswith_space = True
-                break
-        if dir_endswith_space:
-            # Continue to work on the next about object
-            continue
-
-        try:
-            # Generate value for 'about_resource' if it does not exist
-            if not about.about_resource.value:
-                about.about_resource.value = OrderedDict()
-                about_resource_value = ''
-                if about.about_file_path.endswith('/'):
-                    about_resource_value = u'.'
-                else:
-                    about_resource_value = basename(about.about_file_path)
-                about.about_resource.value[about_resource_value] = None
-                about.about_resource.present = True
-                # Check for the existence of the 'about_resource'
-                # If the input already have the 'about_resource' field, it will
-                # be validated when creating the about object
-                loc = util.to_posix(dump_loc)
-                about_file_loc = loc
-                path = join(dirname(util.to_posix(about_file_loc)), about_resource_value)
-                if not exists(path):
-                    path = util.to_posix(path.strip(UNC_PREFIX_POSIX))
-                    path = normpath(path)
-                    msg = (u'Field about_resource: '
-                           u'%(path)s '
-                           u'does not exist' % locals())
-                    not_exist_errors.append(msg)
-
-            if gen_license:
-                # Write generated LICENSE file
-                license_key_name_context_url_list = about.dump_lic(dump_loc, license_dict)
-                if license_key_name_context_url_list:
-                    # use value not "presence"
-                    if not about.license_file.present:
-                        about.license_file.value = OrderedDict()
-                        for lic_key, lic_name, lic_context, lic_url in license_key_name_context_url_list:
-                            gen_license_name = lic_key + u'.LICENSE'
-                            about.license_file.value[gen_license_name] = lic_context
-                            about.license_file.present = True
-                            if not about.license_name.present:
-                                about.license_name.value.append(lic_name)
-                            if not about.license_url.present:
-                                about.license_url.value.append(lic_url)
-                        if about.license_url.value:
-                            about.license_url.present = True
-                        if about.license_name.value:
-                            about.license_name.present = True
-
-            about.dump(dump_loc)
-
-            for e in not_exist_errors:
-                errors.append(Error(INFO, e))
-
-        except Exception as e:
-            # only keep the first 100 char of the exception
-            # TODO: truncated errors are likely making diagnotics harder
-            emsg = repr(e)[:100]
-            msg = (u'Failed to write .ABOUT file at : '
-                   u'%(dump_loc)s '
-                   u'with error: %(emsg)s' % locals())
-            errors.append(Error(ERROR, msg))
+            yield None, err
+
+    for about, errors in iter_load_inventory(location, bdir, reference_dir):
+        if about is not None:
+            errors = errors + dump_about(about, bdir, license_dict)
+        yield about, errors
+
+
+def generate(location, base_dir, reference_dir=None, fetch_license=False):
+    """
+    Load ABOUT data from a CSV inventory at `location`. Write ABOUT files to
+    base_dir. Return errors and about objects.
+    """
+    errors = []
+    abouts = []
+    generated = iter_generate(location, base_dir, reference_dir, fetch_license)
+    for about, about_errors in generated:
+        errors.extend(about_errors)
+        if about is not None:
+            abouts.append(about)
     return unique(errors), abouts
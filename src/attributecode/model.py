@@ -28,24 +28,34 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import bisect
+from collections import Counter
+from collections import namedtuple
 from collections import OrderedDict
+from functools import partial
 import io
 import json
 import os
+import pickle
 # FIXME: why posixpath???
 import posixpath
+import stat
+import sys
+import tempfile
 import traceback
 
 from attributecode.util import python2
 
 if python2:  # pragma: nocover
+    from collections import Mapping  # NOQA
     from itertools import izip_longest as zip_longest  # NOQA
-    from urlparse import urljoin, urlparse  # NOQA
+    from urlparse import urljoin, urlparse, urlunparse  # NOQA
     from urllib2 import urlopen, Request, HTTPError  # NOQA
 else:  # pragma: nocover
     basestring = str  # NOQA
+    from collections.abc import Mapping  # NOQA
     from itertools import zip_longest  # NOQA
-    from urllib.parse import urljoin, urlparse  # NOQA
+    from urllib.parse import urljoin, urlparse, urlunparse  # NOQA
     from urllib.request import urlopen, Request  # NOQA
     from urllib.error import HTTPError  # NOQA
 
@@ -55,6 +65,7 @@ from attributecode import __version__
 from attributecode import CRITICAL
 from attributecode import ERROR
 from attributecode import INFO
+from attributecode import NOTSET
 from attributecode import WARNING
 from attributecode import api
 from attributecode import Error
@@ -62,14 +73,14 @@ from attributecode import saneyaml
 from attributecode import util
 from attributecode.util import add_unc
 from attributecode.util import boolean_fields
+from attributecode.util import bounded_map
 from attributecode.util import copy_license_notice_files
 from attributecode.util import csv
-from attributecode.util import file_fields
 from attributecode.util import filter_errors
+from attributecode.util import is_reported
 from attributecode.util import is_valid_name
+from attributecode.util import normalize_about_text
 from attributecode.util import on_windows
-from attributecode.util import replace_tab_with_spaces
-from attributecode.util import wrap_boolean_value
 from attributecode.util import UNC_PREFIX
 from attributecode.util import ungroup_licenses
 from attributecode.util import unique
@@ -81,6 +92,16 @@ class Field(object):
     An ABOUT file field. The initial value is a string. Subclasses can and
     will alter the value type as needed.
     """
+    # there can be many fields for large inventories: Field objects have no
+    # __dict__ and subclasses must define their own __slots__
+    __slots__ = (
+        'name',
+        'original_value',
+        'value',
+        'required',
+        'present',
+        'errors',
+    )
 
     def __init__(self, name=None, value=None, required=False, present=False):
         # normalized names are lowercased per specification
@@ -105,9 +126,27 @@ class Field(object):
     def default_value(self):
         return ''
 
+    def reset(self):
+        """
+        Reset thyself to the default value and no errors. This is the same as
+        validating an absent and not required field.
+        """
+        self.value = self.default_value()
+        self.errors = []
+
+    @classmethod
+    def has_validator(cls):
+        """
+        Return True if this Field class has a _validate() validator that does
+        more than the default no-op Field._validate().
+        """
+        return cls._validate != Field._validate
+
     def validate(self, *args, **kwargs):
         """
         Validate and normalize thyself. Return a list of errors.
+        Errors below the threshold of an `error_filter` ErrorFilter keyword
+        argument are only counted.
         """
         errors = []
         name = self.name
@@ -117,7 +156,7 @@ class Field(object):
             # required fields must be present
             if self.required:
                 msg = u'Field %(name)s is required'
-                errors.append(Error(CRITICAL, msg % locals()))
+                errors.append(Error(CRITICAL, msg % locals(), code='required-field', field=name))
                 return errors
         else:
             # present fields should have content ...
@@ -128,10 +167,13 @@ class Field(object):
                 if self.required:
                     msg = u'Field %(name)s is required and empty'
                     severity = CRITICAL
+                    code = 'required-field'
                 else:
                     severity = INFO
                     msg = u'Field %(name)s is present but empty.'
-                errors.append(Error(severity, msg % locals()))
+                    code = 'empty-field'
+                if is_reported(severity, kwargs.get('error_filter')):
+                    errors.append(Error(severity, msg % locals(), code=code, field=name))
             else:
                 # present fields with content go through validation...
                 # first trim any trailing spaces on each line
@@ -143,13 +185,18 @@ class Field(object):
                 else:
                     value = self.original_value
                 self.value = value
+                if not self.has_validator():
+                    # nothing more to validate
+                    self.errors = errors
+                    return errors
                 try:
                     validation_errors = self._validate(*args, **kwargs)
                     errors.extend(validation_errors)
                 except Exception as e:
                     emsg = repr(e)
                     msg = u'Error validating field %(name)s: %(value)r: %(emsg)r'
-                    errors.append(Error(CRITICAL, msg % locals()))
+                    errors.append(Error(CRITICAL, msg % locals(),
+                                        code='validation-error', field=name))
                     raise
 
         # set or reset self
@@ -235,9 +282,7 @@ class StringField(Field):
     A field containing a string value possibly on multiple lines.
     The validated value is a string.
     """
-    def _validate(self, *args, **kwargs):
-        errors = super(StringField, self)._validate(*args, ** kwargs)
-        return errors
+    __slots__ = ()
 
     def _serialized_value(self):
         return self.value if self.value else u''
@@ -273,6 +318,8 @@ class SingleLineField(StringField):
     A field containing a string value on a single line. The validated value is
     a string.
     """
+    __slots__ = ()
+
     def _validate(self, *args, **kwargs):
         errors = super(SingleLineField, self)._validate(*args, ** kwargs)
         if self.value and isinstance(self.value, basestring) and '\n' in self.value:
@@ -280,7 +327,7 @@ class SingleLineField(StringField):
             value = self.original_value
             msg = (u'Field %(name)s: Cannot span multiple lines: %(value)s'
                    % locals())
-            errors.append(Error(ERROR, msg))
+            errors.append(Error(ERROR, msg, code='multiple-lines', field=name))
         return errors
 
 
@@ -289,6 +336,8 @@ class ListField(StringField):
     A field containing a list of string values, one per line. The validated
     value is a list.
     """
+    __slots__ = ()
+
     def default_value(self):
         return []
 
@@ -309,10 +358,11 @@ class ListField(StringField):
             if isinstance(val, basestring):
                 val = val.strip()
             if not val:
-                name = self.name
-                msg = (u'Field %(name)s: ignored empty list value'
-                       % locals())
-                errors.append(Error(INFO, msg))
+                if is_reported(INFO, kwargs.get('error_filter')):
+                    name = self.name
+                    msg = (u'Field %(name)s: ignored empty list value'
+                           % locals())
+                    errors.append(Error(INFO, msg, code='empty-list-value', field=name))
                 continue
             # keep only unique and report error for duplicates
             if val not in self.value:
@@ -321,7 +371,7 @@ class ListField(StringField):
                 name = self.name
                 msg = (u'Field %(name)s: ignored duplicated list value: '
                        '%(val)r' % locals())
-                errors.append(Error(WARNING, msg))
+                errors.append(Error(WARNING, msg, code='duplicate-list-value', field=name))
         return errors
 
     def _serialized_value(self):
@@ -351,10 +401,55 @@ class ListField(StringField):
         if sval == oval:
             return True
 
+def check_url(url):
+    """
+    Return True if a URL is valid.
+    """
+    scheme, netloc, _path, _p, _q, _frg = urlparse(url)
+    valid = scheme in ('http', 'https', 'ftp') and netloc
+    return valid
+
+
+def normalize_url(url):
+    """
+    Return a `url` string normalized with surrounding spaces removed and its
+    scheme and host in lowercase or None if the URL is not valid.
+    """
+    # the scheme is returned in lowercase
+    scheme, netloc, path, params, query, fragment = urlparse(url.strip())
+    if scheme not in ('http', 'https', 'ftp') or not netloc:
+        return None
+    return urlunparse((scheme, netloc.lower(), path, params, query, fragment))
+
+
+# normalized URLs shared by all the URL fields keyed by URL stripped from
+# spaces: the same URLs are often repeated across many ABOUT files
+url_validation_cache = util.BoundedCache(max_size=50000)
+
+
+def get_normalized_url(url):
+    """
+    Return a normalized `url` string or None if the URL is not valid. Results
+    are cached.
+    """
+    return url_validation_cache.get_or_compute(url.strip(), normalize_url)
+
+
+def is_valid_url(url):
+    """
+    Return True if a URL is valid. Results are cached.
+    """
+    if not isinstance(url, basestring):
+        return check_url(url)
+    return get_normalized_url(url) is not None
+
+
 class UrlListField(ListField):
     """
     A URL field. The validated value is a list of URLs.
     """
+    __slots__ = ()
+
     def _validate(self, *args, **kwargs):
         """
         Check that URLs are valid. Return a list of errors.
@@ -365,23 +460,18 @@ class UrlListField(ListField):
         for url in val:
             if not self.is_valid_url(url):
                 msg = (u'Field %(name)s: Invalid URL: %(val)s' % locals())
-                errors.append(Error(WARNING, msg))
+                errors.append(Error(WARNING, msg, code='invalid-url', field=name))
         return errors
 
-    @staticmethod
-    def is_valid_url(url):
-        """
-        Return True if a URL is valid.
-        """
-        scheme, netloc, _path, _p, _q, _frg = urlparse(url)
-        valid = scheme in ('http', 'https', 'ftp') and netloc
-        return valid
+    is_valid_url = staticmethod(is_valid_url)
 
 
 class UrlField(StringField):
     """
     A URL field. The validated value is a URL.
     """
+    __slots__ = ()
+
     def _validate(self, *args, **kwargs):
         """
         Check that URL is valid. Return a list of errors.
@@ -391,17 +481,10 @@ class UrlField(StringField):
         val = self.value
         if not self.is_valid_url(val):
             msg = (u'Field %(name)s: Invalid URL: %(val)s' % locals())
-            errors.append(Error(WARNING, msg))
+            errors.append(Error(WARNING, msg, code='invalid-url', field=name))
         return errors
 
-    @staticmethod
-    def is_valid_url(url):
-        """
-        Return True if a URL is valid.
-        """
-        scheme, netloc, _path, _p, _q, _frg = urlparse(url)
-        valid = scheme in ('http', 'https', 'ftp') and netloc
-        return valid
+    is_valid_url = staticmethod(is_valid_url)
 
 
 class PathField(ListField):
@@ -410,6 +493,19 @@ class PathField(ListField):
     The validated value is an ordered dict of path->location or None.
     The paths can also be resolved
     """
+    __slots__ = (
+        'resolved_paths',
+        'about_file_path',
+        'running_inventory',
+        'base_dir',
+        'reference_dir',
+    )
+
+    def __init__(self, *args, ** kwargs):
+        super(PathField, self).__init__(*args, ** kwargs)
+        # list of the locations checked for existence during validation
+        self.resolved_paths = []
+
     def default_value(self):
         return {}
 
@@ -426,6 +522,7 @@ class PathField(ListField):
         self.running_inventory = kwargs.get('running_inventory')
         self.base_dir = kwargs.get('base_dir')
         self.reference_dir = kwargs.get('reference_dir')
+        path_index = kwargs.get('path_index')
 
         if self.base_dir:
             self.base_dir = util.to_posix(self.base_dir)
@@ -438,6 +535,7 @@ class PathField(ListField):
         # the value is used as the context of the file 
         # dict of normalized paths to a location or None
         paths = OrderedDict()
+        self.resolved_paths = []
 
         for path_value in self.value:
             p = path_value.split(',')
@@ -460,7 +558,7 @@ class PathField(ListField):
                 if not (self.base_dir or self.reference_dir):
                     msg = (u'Field %(name)s: Unable to verify path: %(path)s:'
                            u' No base directory provided' % locals())
-                    errors.append(Error(ERROR, msg))
+                    errors.append(Error(ERROR, msg, code='no-base-directory', field=name))
                     location = None
                     paths[path] = location
                     continue
@@ -486,18 +584,25 @@ class PathField(ListField):
                 location = util.to_native(location)
                 location = os.path.abspath(os.path.normpath(location))
                 location = util.to_posix(location)
+                self.resolved_paths.append(location)
+                if path_index is not None:
+                    exists = path_index.exists(location)
+                else:
+                    exists = os.path.exists(add_unc(location))
                 location = add_unc(location)
         
-                if not os.path.exists(location):
-                    # We don't want to show the UNC_PREFIX in the error message
-                    location = util.to_posix(location.strip(UNC_PREFIX))
-                    msg = (u'Field %(name)s: Path %(location)s not found'
-                           % locals())
+                if not exists:
                     # We want to show INFO error for 'about_resource'
                     if name == u'about_resource':
-                        errors.append(Error(INFO, msg))
+                        severity = INFO
                     else:
-                        errors.append(Error(CRITICAL, msg))
+                        severity = CRITICAL
+                    if is_reported(severity, kwargs.get('error_filter')):
+                        # We don't want to show the UNC_PREFIX in the error message
+                        location = util.to_posix(location.strip(UNC_PREFIX))
+                        msg = (u'Field %(name)s: Path %(location)s not found'
+                               % locals())
+                        errors.append(Error(severity, msg, code='path-not-found', field=name))
                     location = None
         
                 paths[path] = location
@@ -511,30 +616,112 @@ class AboutResourceField(PathField):
     Special field for about_resource. self.resolved_paths contains a list of
     the paths resolved relative to the about file path.
     """
-    def __init__(self, *args, ** kwargs):
-        super(AboutResourceField, self).__init__(*args, ** kwargs)
-        self.resolved_paths = []
+    __slots__ = ()
+
+class TextStore(object):
+    """
+    A store of the texts of files such as license and notice files keyed by
+    location. A text referenced from many ABOUT files is loaded once and the
+    same string is shared by all the About objects.
+    """
+
+    def __init__(self):
+        # mapping of {location: (file identity, text)}
+        self.texts = {}
+
+    def get_text(self, location):
+        """
+        Return the text of the file at `location`. Raise an exception if it
+        cannot be loaded. The text is reloaded if the file has changed.
+        """
+        from attributecode.cache import get_file_identity
+        identity = get_file_identity(location)
+        stored = self.texts.get(location)
+        if stored and identity and stored[0] == identity:
+            return stored[1]
+        with io.open(add_unc(location), encoding='utf-8') as txt:
+            text = txt.read()
+        self.texts[location] = identity, text
+        return text
+
+    def check(self, location):
+        """
+        Return an error message if the file at `location` is not a readable
+        file or None otherwise. The file is not read: a text that is not valid
+        UTF-8 fails to load when it is accessed.
+        """
+        location = add_unc(location)
+        try:
+            mode = os.stat(location).st_mode
+        except (OSError, IOError) as e:
+            return repr(e)
+        if not stat.S_ISREG(mode):
+            return 'Not a file: %(location)r' % locals()
+        if not os.access(location, os.R_OK):
+            return 'Permission denied: %(location)r' % locals()
+
+    def clear(self):
+        """
+        Release all the texts of this store.
+        """
+        self.texts.clear()
+
+
+# the texts shared by all the FileTextField objects of a run
+file_texts = TextStore()
+
+
+class FileTexts(Mapping):
+    """
+    An ordered mapping of path to the text of the file at the corresponding
+    location. Texts are loaded from the shared file_texts TextStore only when
+    accessed. The value is the location if the text cannot be loaded or None
+    if there is no location.
+    """
+    __slots__ = ('locations',)
+
+    def __init__(self, locations):
+        # ordered mapping of {path: location or None}
+        self.locations = locations
+
+    def __getitem__(self, path):
+        location = self.locations[path]
+        if not location:
+            return location
+        try:
+            return file_texts.get_text(location)
+        except Exception:
+            # errors are reported when the field is validated
+            return location
+
+    def __iter__(self):
+        return iter(self.locations)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __repr__(self):
+        return repr(OrderedDict(self.items()))
 
-    def _validate(self, *args, **kwargs):
-        errors = super(AboutResourceField, self)._validate(*args, ** kwargs)
-        return errors
 
 class FileTextField(PathField):
     """
     A path field pointing to one or more text files such as license files.
-    The validated value is an ordered dict of path->Text or None if no
-    location or text could not be loaded.
+    The validated value is an ordered mapping of path->Text or None if no
+    location or text could not be loaded. Texts are loaded on first access.
     """
+    __slots__ = ()
+
     def _validate(self, *args, **kwargs):
         """
-        Load and validate the texts referenced by paths fields. Return a list
-        of errors. base_dir is the directory used to resolve a file location
-        from a path.
+        Check that the texts referenced by paths fields can be loaded. Return a
+        list of errors. base_dir is the directory used to resolve a file
+        location from a path.
         """
         errors = super(FileTextField, self)._validate(*args, ** kwargs)
         # a FileTextField is a PathField
         # self.value is a paths to location ordered dict
-        # we will replace the location with the text content
+        # we will replace the location with the text content when accessed
         name = self.name
         for path, location in self.value.items():
             if not location:
@@ -542,27 +729,26 @@ class FileTextField(PathField):
                 # errors about non existing locations are PathField errors
                 # already collected.
                 continue
-            try:
-                # TODO: we have lots the location by replacing it with a text
-                location = add_unc(location)
-                with io.open(location, encoding='utf-8') as txt:
-                    text = txt.read()
-                self.value[path] = text
-            except Exception as e:
+            error = file_texts.check(location)
+            if error:
                 # only keep the first 100 char of the exception
-                emsg = repr(e)[:100]
+                emsg = error[:100]
                 msg = (u'Field %(name)s: Failed to load text at path: '
                        u'%(path)s '
                        u'with error: %(emsg)s' % locals())
-                errors.append(Error(ERROR, msg))
+                errors.append(Error(ERROR, msg, code='text-load-error', field=name))
+        self.value = FileTexts(self.value)
         # set or reset self
         self.errors = errors
         return errors
 
+
 class BooleanField(SingleLineField):
     """
     An flag field with a boolean value. Validated value is False, True or None.
     """
+    __slots__ = ('about_file_path',)
+
     def default_value(self):
         return None
 
@@ -585,12 +771,13 @@ class BooleanField(SingleLineField):
             flag_values = self.flag_values
             msg = (u'Path: %(about_file_path)s - Field %(name)s: Invalid flag value: %(val)r is not '
                    u'one of: %(flag_values)s' % locals())
-            errors.append(Error(ERROR, msg))
+            errors.append(Error(ERROR, msg, code='invalid-flag', field=name))
             self.value = None
         elif flag is None:
-            name = self.name
-            msg = (u'Field %(name)s: field is present but empty. ' % locals())
-            errors.append(Error(INFO, msg))
+            if is_reported(INFO, kwargs.get('error_filter')):
+                name = self.name
+                msg = (u'Field %(name)s: field is present but empty. ' % locals())
+                errors.append(Error(INFO, msg, code='empty-field', field=name))
             self.value = None
         else:
             if flag == u'yes' or flag is True:
@@ -657,33 +844,183 @@ class BooleanField(SingleLineField):
 
 
 def validate_fields(fields, about_file_path, running_inventory, base_dir,
-                    reference_dir=None):
+                    reference_dir=None, path_index=None, error_filter=None):
     """
     Validate a sequence of Field objects. Return a list of errors.
     Validation may update the Field objects as needed as a side effect.
+    Check path existence with the `path_index` PathIndex if provided. Only
+    count the errors below the threshold of the `error_filter` ErrorFilter if
+    provided.
     """
     errors = []
-    for f in fields:
-        val_err = f.validate(
-            base_dir=base_dir,
-            about_file_path=about_file_path,
-            running_inventory=running_inventory,
-            reference_dir=reference_dir,
-        )
-        errors.extend(val_err)
+    kwargs = dict(
+        base_dir=base_dir,
+        about_file_path=about_file_path,
+        running_inventory=running_inventory,
+        reference_dir=reference_dir,
+        path_index=path_index,
+        error_filter=error_filter,
+    )
+    for f, needs_validation in plan_validation(fields):
+        if needs_validation:
+            errors.extend(f.validate(**kwargs))
+        else:
+            f.reset()
     return errors
 
 
+def plan_validation(fields):
+    """
+    Yield tuples of (Field, needs validation flag) for a sequence of Field
+    objects. A Field that is neither present nor required is absent and has
+    nothing to validate: it only needs to be reset to its default value.
+    """
+    for f in fields:
+        yield f, f.present or f.required
+
+
+def parse_about_text(text):
+    """
+    Return a mapping of fields loaded from an ABOUT file `text`. Raise an
+    Exception if this text is not valid.
+    """
+    # most ABOUT files use a simple subset of YAML that is loaded faster
+    # without saneyaml
+    data = util.fast_load_about(text)
+    if data is None:
+        text = normalize_about_text(text)
+        data = saneyaml.load(text, allow_duplicate_keys=False)
+    return data
+
+
 def validate_field_name(name):
     if not is_valid_name(name):
         msg = ('Field name: %(name)r contains illegal name characters: '
                '0 to 9, a to z, A to Z and _.')
-        return Error(CRITICAL, msg % locals())
+        return Error(CRITICAL, msg % locals(), code='invalid-field-name', field=name)
+
+
+# The standard fields of an About object. This is compiled once from the
+# About.schema and must not be modified.
+Schema = namedtuple('Schema', [
+    # tuple of standard field names in the standard order
+    'names',
+    # {name: Field class} mapping
+    'field_classes',
+    # frozen set of required field names
+    'required',
+    # frozen set of the names of the BooleanField fields
+    'boolean_fields',
+    # frozen set of the names of the PathField fields referencing files
+    'file_fields',
+    # {name: Field} mapping of shared default Field objects that stand for
+    # absent fields: these must never be modified
+    'defaults',
+])
+
+
+def compile_schema(fields, required=()):
+    """
+    Return a Schema given a sequence of (name, Field class) tuples in the
+    standard order and a `required` sequence of required field names.
+    """
+    names = tuple(name for name, _cls in fields)
+    field_classes = OrderedDict(fields)
+    required = frozenset(required)
+    return Schema(
+        names=names,
+        field_classes=field_classes,
+        required=required,
+        boolean_fields=frozenset(
+            name for name, cls in field_classes.items()
+            if issubclass(cls, BooleanField)),
+        file_fields=frozenset(
+            name for name, cls in field_classes.items()
+            if issubclass(cls, PathField)),
+        defaults=dict(
+            (name, cls(name=name, required=name in required))
+            for name, cls in fields),
+    )
+
+
+class LazyFields(object):
+    """
+    An ordered mapping of standard field name to Field object where Field
+    objects are only created when they are first accessed by name, such that
+    an About object does not carry a Field object for each absent field.
+
+    Iterating the values or items returns the created Field objects and a
+    shared default Field for each field that was never accessed.
+    """
+    __slots__ = ('schema', 'created',)
+
+    def __init__(self, schema):
+        self.schema = schema
+        # mapping of {name: Field} for the fields created so far
+        self.created = {}
+        # required fields are always needed
+        for name in schema.required:
+            self[name]
+
+    def __getitem__(self, name):
+        field = self.created.get(name)
+        if field is None:
+            schema = self.schema
+            field_class = schema.field_classes[name]
+            required = name in schema.required
+            field = self.created[name] = field_class(name=name, required=required)
+        return field
+
+    def get(self, name, default=None):
+        if name not in self.schema.field_classes:
+            return default
+        return self[name]
+
+    def created_values(self):
+        """
+        Return a list of the created Field objects in the standard order.
+        """
+        created = self.created
+        return [created[name] for name in self.schema.names if name in created]
+
+    def __contains__(self, name):
+        return name in self.schema.field_classes
+
+    def __iter__(self):
+        return iter(self.schema.names)
+
+    def __len__(self):
+        return len(self.schema.names)
+
+    def keys(self):
+        return list(self.schema.names)
+
+    def values(self):
+        return [field for _name, field in self.items()]
+
+    def items(self):
+        created = self.created
+        defaults = self.schema.defaults
+        return [(name, created.get(name) or defaults[name])
+                for name in self.schema.names]
+
+    def __eq__(self, other):
+        return (isinstance(other, LazyFields)
+                and self.items() == other.items())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return 'LazyFields(%r)' % self.items()
 
 
 class About(object):
     """
     Represent an ABOUT file and functions to parse and validate a file.
+
+    Standard Field objects are created lazily when they are first accessed as
+    attributes or from the `fields` mapping.
     """
     # special names, used only when serializing lists of ABOUT files to CSV or
     # similar
@@ -703,74 +1040,89 @@ class About(object):
     def get_required_fields(self):
         return [f for f in self.fields if f.required]
 
+    # The standard fields schema compiled once from (name, Field class)
+    # tuples in the standard fields order
+    schema = compile_schema([
+        ('about_resource', AboutResourceField),
+        ('name', SingleLineField),
+        ('version', SingleLineField),
+
+        ('download_url', UrlField),
+        ('description', StringField),
+        ('homepage_url', UrlField),
+        ('notes', StringField),
+
+        ('license_expression', StringField),
+        ('license_key', ListField),
+        ('license_name', ListField),
+        ('license_file', FileTextField),
+        ('license_url', UrlListField),
+        ('copyright', StringField),
+        ('notice_file', FileTextField),
+        ('notice_url', UrlField),
+
+        ('redistribute', BooleanField),
+        ('attribute', BooleanField),
+        ('track_changes', BooleanField),
+        ('modified', BooleanField),
+        ('internal_use_only', BooleanField),
+
+        ('changelog_file', FileTextField),
+
+        ('owner', StringField),
+        ('owner_url', UrlField),
+        ('contact', StringField),
+        ('author', StringField),
+        ('author_file', FileTextField),
+
+        ('vcs_tool', SingleLineField),
+        ('vcs_repository', SingleLineField),
+        ('vcs_path', SingleLineField),
+        ('vcs_tag', SingleLineField),
+        ('vcs_branch', SingleLineField),
+        ('vcs_revision', SingleLineField),
+
+        ('checksum_md5', SingleLineField),
+        ('checksum_sha1', SingleLineField),
+        ('checksum_sha256', SingleLineField),
+        ('spec_version', SingleLineField),
+    ], required=required_fields)
+
     def set_standard_fields(self):
         """
-        Create fields in an ordered dict to keep a standard ordering. We
+        Create fields in an ordered mapping to keep a standard ordering. We
         could use a metaclass to track ordering django-like but this approach
-        is simpler.
-        """
-        self.fields = OrderedDict([
-            ('about_resource', AboutResourceField(required=True)),
-            ('name', SingleLineField(required=True)),
-            ('version', SingleLineField()),
-
-            ('download_url', UrlField()),
-            ('description', StringField()),
-            ('homepage_url', UrlField()),
-            ('notes', StringField()),
-
-            ('license_expression', StringField()),
-            ('license_key', ListField()),
-            ('license_name', ListField()),
-            ('license_file', FileTextField()),
-            ('license_url', UrlListField()),
-            ('copyright', StringField()),
-            ('notice_file', FileTextField()),
-            ('notice_url', UrlField()),
-
-            ('redistribute', BooleanField()),
-            ('attribute', BooleanField()),
-            ('track_changes', BooleanField()),
-            ('modified', BooleanField()),
-            ('internal_use_only', BooleanField()),
-
-            ('changelog_file', FileTextField()),
-
-            ('owner', StringField()),
-            ('owner_url', UrlField()),
-            ('contact', StringField()),
-            ('author', StringField()),
-            ('author_file', FileTextField()),
-
-            ('vcs_tool', SingleLineField()),
-            ('vcs_repository', SingleLineField()),
-            ('vcs_path', SingleLineField()),
-            ('vcs_tag', SingleLineField()),
-            ('vcs_branch', SingleLineField()),
-            ('vcs_revision', SingleLineField()),
-
-            ('checksum_md5', SingleLineField()),
-            ('checksum_sha1', SingleLineField()),
-            ('checksum_sha256', SingleLineField()),
-            ('spec_version', SingleLineField()),
-        ])
-
-        for name, field in self.fields.items():
-            # we could have a hack to get the actual field name
-            # but setting an attribute is explicit and cleaner
-            field.name = name
-            setattr(self, name, field)
-
-    def __init__(self, location=None, about_file_path=None, strict=False):
+        is simpler. Only the required Field objects are created upfront.
+        """
+        self.fields = LazyFields(self.schema)
+
+    def __getattr__(self, name):
+        """
+        Return the standard Field object `name`, created on first access.
+        """
+        # this is called only for missing attributes: `fields` is missing
+        # while unpickling
+        fields = self.__dict__.get('fields')
+        if fields is None or name not in fields:
+            raise AttributeError(name)
+        return fields[name]
+
+    def __init__(self, location=None, about_file_path=None, strict=False,
+                 path_index=None, min_severity=NOTSET):
         """
         Create an instance.
         If strict is True, raise an Exception on errors. Otherwise the errors
-        attribute contains the errors.
+        attribute contains the errors. Check the existence of paths with the
+        `path_index` PathIndex if provided.
+
+        Errors with a severity below `min_severity` are not created: they are
+        only counted by severity in the suppressed_errors mapping.
         """
         self.set_standard_fields()
         self.custom_fields = OrderedDict()
 
         self.errors = []
+        self.suppressed_errors = {}
 
         # about file path relative to the root of an inventory using posix
         # path separators
@@ -781,7 +1133,8 @@ class About(object):
         self.base_dir = None
         if self.location:
             self.base_dir = os.path.dirname(location)
-            self.errors.extend(self.load(location))
+            self.errors.extend(self.load(
+                location, path_index=path_index, min_severity=min_severity))
             if strict and self.errors and filter_errors(self.errors):
                 msg = '\n'.join(map(str, self.errors))
                 raise Exception(msg)
@@ -815,11 +1168,12 @@ class About(object):
         data.update(non_empty)
         return data
 
-    def hydrate(self, fields):
+    def hydrate(self, fields, error_filter=None):
         """
         Process an iterable of field (name, value) tuples. Update or create
         Fields attributes and the fields and custom fields dictionaries.
-        Return a list of errors.
+        Return a list of errors. Only count the errors below the threshold of
+        the `error_filter` ErrorFilter if provided.
         """
         errors = []
         seen_fields = OrderedDict()
@@ -842,10 +1196,12 @@ class About(object):
             previous_value = seen_fields.get(name)
             if previous_value:
                 if value != previous_value:
-                    msg = (u'Field %(orig_name)s is a duplicate. '
-                           u'Original value: "%(previous_value)s" '
-                           u'replaced with: "%(value)s"')
-                    errors.append(Error(WARNING, msg % locals()))
+                    if is_reported(WARNING, error_filter):
+                        msg = (u'Field %(orig_name)s is a duplicate. '
+                               u'Original value: "%(previous_value)s" '
+                               u'replaced with: "%(value)s"')
+                        errors.append(Error(WARNING, msg % locals(),
+                                            code='duplicate-field', field=name))
                     continue
 
             seen_fields[name] = value
@@ -865,8 +1221,9 @@ class About(object):
                 errors.append(illegal_name_error)
                 continue
 
-            msg = 'Field %(orig_name)s is a custom field.'
-            errors.append(Error(INFO, msg % locals()))
+            if is_reported(INFO, error_filter):
+                msg = 'Field %(orig_name)s is a custom field.'
+                errors.append(Error(INFO, msg % locals(), code='custom-field', field=name))
             # is this a known one?
             custom_field = self.custom_fields.get(name)
             if custom_field:
@@ -887,12 +1244,14 @@ class About(object):
                     setattr(self, name, custom_field)
                 except:
                     msg = 'Internal error with custom field: %(name)r: %(value)r.'
-                    errors.append(Error(CRITICAL, msg % locals()))
+                    errors.append(Error(CRITICAL, msg % locals(),
+                                        code='internal-error', field=name))
 
         return errors
 
     def process(self, fields, about_file_path, running_inventory=False,
-                base_dir=None, reference_dir=None):
+                base_dir=None, reference_dir=None, path_index=None,
+                error_filter=None):
         """
         Validate and set as attributes on this About object a sequence of
         `fields` name/value tuples. Return a list of errors.
@@ -901,28 +1260,35 @@ class About(object):
         self.reference_dir = reference_dir
         afp = self.about_file_path
 
-        errors = self.hydrate(fields)
+        errors = self.hydrate(fields, error_filter=error_filter)
         # We want to copy the license_files before the validation
         if reference_dir:
             copy_license_notice_files(
                 fields, base_dir, reference_dir, afp)
 
-        # TODO: why? we validate all fields, not only these hydrated
+        # Only validate the created fields: the required fields and the fields
+        # that were set or accessed. Fields that were never created are absent
+        # and have nothing to validate: these are shared default Field objects.
+        fields = self.fields.created_values() + list(self.custom_fields.values())
         validation_errors = validate_fields(
-            self.all_fields(),
+            fields,
             about_file_path,
             running_inventory,
             self.base_dir,
-            self.reference_dir)
+            self.reference_dir,
+            path_index,
+            error_filter)
         errors.extend(validation_errors)
         return errors
 
-    def load(self, location):
+    def load(self, location, path_index=None, min_severity=NOTSET):
         """
         Read, parse and process the ABOUT file at `location`.
-        Return a list of errors and update self with errors.
+        Return a list of errors and update self with errors. Errors below
+        `min_severity` are only counted in self.suppressed_errors.
         """
         self.location = location
+        error_filter = util.ErrorFilter(min_severity)
         loc = util.to_posix(location)
         base_dir = posixpath.dirname(loc)
         errors = []
@@ -930,14 +1296,6 @@ class About(object):
             loc = add_unc(loc)
             with io.open(loc, encoding='utf-8') as txt:
                 input_text = txt.read()
-            # The 'Yes' and 'No' will be converted to 'True' and 'False' in the yaml.load()
-            # Therefore, we need to wrap the original value in quote to prevent
-            # the conversion
-            pre_input = wrap_boolean_value(input_text)
-            # saneyaml.load() will have parsing error if the input has
-            # tab value. Therefore, we should check if the input contains
-            # any tab and then convert it to spaces.
-            input = replace_tab_with_spaces(pre_input)
             # FIXME: this should be done in the commands, not here
             """
             The running_inventory defines if the current process is 'inventory' or not.
@@ -949,23 +1307,28 @@ class About(object):
             and then join with the 'about_resource'
             """
             running_inventory = True
-            data = saneyaml.load(input, allow_duplicate_keys=False)
-            errs = self.load_dict(data, base_dir, running_inventory)
+            data = parse_about_text(input_text)
+            errs = self.load_dict(data, base_dir, running_inventory,
+                                  path_index=path_index,
+                                  error_filter=error_filter)
             errors.extend(errs)
         except Exception as e:
             trace = traceback.format_exc()
             msg = 'Cannot load invalid ABOUT file: %(location)r: %(e)r\n%(trace)s'
-            errors.append(Error(CRITICAL, msg % locals()))
+            errors.append(Error(CRITICAL, msg % locals(), code='invalid-about-file'))
 
         self.errors = errors
+        self.suppressed_errors = dict(error_filter.suppressed)
         return errors
 
     # FIXME: should be a from_dict class factory instead
     # FIXME: running_inventory: remove this : this should be done in the commands, not here
-    def load_dict(self, fields_dict, base_dir, running_inventory=False, reference_dir=None,):
+    def load_dict(self, fields_dict, base_dir, running_inventory=False, reference_dir=None,
+                  path_index=None, error_filter=None):
         """
         Load this About object file from a `fields_dict` name/value dict.
-        Return a list of errors.
+        Return a list of errors. Only count the errors below the threshold of
+        the `error_filter` ErrorFilter if provided.
         """
         # do not keep empty
         fields = list(fields_dict.items())
@@ -997,6 +1360,8 @@ class About(object):
             running_inventory=running_inventory,
             base_dir=base_dir,
             reference_dir=reference_dir,
+            path_index=path_index,
+            error_filter=error_filter,
         )
         self.errors = errors
         return errors
@@ -1020,7 +1385,8 @@ class About(object):
         license_name = []
         license_file = []
         license_url = []
-        bool_fields = ['redistribute', 'attribute', 'track_changes', 'modified', 'internal_use_only']
+        bool_fields = self.schema.boolean_fields
+        file_fields = self.schema.file_fields
         for field in self.all_fields():
             if not field.value and not field.name in bool_fields:
                 continue
@@ -1125,27 +1491,183 @@ class About(object):
         return license_key_name_context_url
 
 
-def collect_inventory(location):
+def collect_inventory(location, jobs=1, cache_dir=None, min_severity=NOTSET,
+                      changed_since=None):
     """
     Collect ABOUT files at location and return a list of errors and a list of
     About objects.
+
+    Use up to `jobs` processes to load and validate ABOUT files in parallel.
+    The returned About objects and errors are always in the same sorted order
+    regardless of the number of `jobs`. If `cache_dir` is provided, reuse and
+    update the About objects cached in this directory.
+
+    Errors with a severity below `min_severity` are not created: they are
+    only counted in the suppressed_errors of each About (see
+    count_suppressed_errors()).
+
+    If `changed_since` is a git revision, only collect the ABOUT files that
+    changed since this revision in the git work tree of `location` or that
+    reference a changed file.
     """
     errors = []
+    abouts = []
+    inventory = iter_inventory(location, jobs, cache_dir, min_severity, changed_since)
+    for about, about_errors in inventory:
+        errors.extend(about_errors)
+        if about is not None:
+            abouts.append(about)
+    return unique(errors), abouts
+
+
+def iter_inventory(location, jobs=1, cache_dir=None, min_severity=NOTSET,
+                   changed_since=None):
+    """
+    Collect ABOUT files at location and yield tuples of (About object, list of
+    errors) as they are loaded such that a whole tree of ABOUT files does not
+    need to be kept in memory. The errors of each About are prefixed with its
+    about_file_path.
+
+    Errors that are not specific to an ABOUT file (such as duplicated file
+    names) are yielded first as a (None, list of errors) tuple.
+    See collect_inventory() for the `jobs`, `cache_dir`, `min_severity` and
+    `changed_since` arguments.
+    """
     input_location = util.get_absolute(location)
-    about_locations = list(util.get_about_locations(input_location))
+    # the paths found during the walk are used to check the existence of the
+    # paths referenced in ABOUT files without stat calls
+    path_index = util.PathIndex()
+    about_locations = list(util.get_about_locations(
+        input_location, workers=jobs, sort=True, path_index=path_index))
 
     name_errors = util.check_file_names(about_locations)
-    errors.extend(name_errors)
-    abouts = []
-    for about_loc in about_locations:
-        about_file_path = util.get_relative_path(input_location, about_loc)
-        about = About(about_loc, about_file_path)
+    if changed_since:
+        from attributecode.changes import filter_changed_about_locations
+        about_locations, change_errors = filter_changed_about_locations(
+            input_location, about_locations, changed_since, jobs)
+        name_errors.extend(change_errors)
+    if name_errors:
+        yield None, name_errors
+
+    about_file_paths = [util.get_relative_path(input_location, about_loc)
+                        for about_loc in about_locations]
+    loaded = load_abouts(about_locations, about_file_paths, jobs=jobs,
+                         cache_dir=cache_dir, path_index=path_index,
+                         min_severity=min_severity)
+    for about_file_path, about in zip(about_file_paths, loaded):
         # Insert about_file_path reference to the error
-        for severity, message in about.errors:
-            msg = (about_file_path + ": " + message)
-            errors.append(Error(severity, msg))
-        abouts.append(about)
-    return unique(errors), abouts
+        errors = []
+        for error in about.errors:
+            msg = (about_file_path + ": " + error.message)
+            errors.append(Error(error.severity, msg, code=error.code,
+                                path=about_file_path, field=error.field))
+        yield about, errors
+
+
+def load_about(location, about_file_path, cache_dir=None, path_index=None,
+               min_severity=NOTSET):
+    """
+    Return an About object loaded from the ABOUT file at `location` with an
+    `about_file_path` relative path.
+
+    If `cache_dir` is provided, reuse a cached About if the ABOUT file and the
+    files it references are unchanged or cache the newly loaded About.
+    Check the existence of paths with the `path_index` PathIndex if provided.
+    Errors below `min_severity` are only counted.
+    """
+    if not cache_dir:
+        return About(location, about_file_path, path_index=path_index,
+                     min_severity=min_severity)
+
+    from attributecode.cache import AboutCache
+    cache = AboutCache(cache_dir, min_severity=min_severity)
+    about = cache.get(location, about_file_path)
+    if about is None:
+        about = About(location, about_file_path, path_index=path_index,
+                      min_severity=min_severity)
+        cache.put(about)
+    return about
+
+
+# the PathIndex used by load_abouts_in_worker() in a process pool worker
+worker_path_index = None
+
+
+def set_worker_path_index(path_index):
+    """
+    Set the PathIndex used in this process pool worker. This is sent once to
+    each worker rather than with each ABOUT file.
+
+    Before Python 3.7, a process pool has no worker initializer: this is
+    called in the parent process before the workers are forked such that they
+    inherit this PathIndex. Workers that are not forked (such as on Windows)
+    check paths with stat calls instead.
+    """
+    global worker_path_index
+    worker_path_index = path_index
+
+
+def load_abouts_in_worker(chunk, cache_dir=None, min_severity=NOTSET):
+    """
+    Return a list of About objects loaded with load_about() in a process pool
+    worker from a `chunk` list of (location, about_file_path) tuples.
+    """
+    return [load_about(location, about_file_path, cache_dir, worker_path_index,
+                       min_severity)
+            for location, about_file_path in chunk]
+
+
+def load_abouts(about_locations, about_file_paths, jobs=1, cache_dir=None,
+                path_index=None, min_severity=NOTSET):
+    """
+    Yield About objects loaded from the `about_locations` list of ABOUT file
+    locations and the corresponding `about_file_paths` list of relative paths.
+
+    If `jobs` is more than one, files are loaded and validated in a pool of
+    `jobs` processes. About objects are always yielded in the order of the
+    `about_locations`. Use the `cache_dir` About cache and the `path_index`
+    PathIndex if provided. Errors below `min_severity` are only counted.
+    """
+    if not jobs or jobs <= 1 or len(about_locations) <= 1:
+        for location, about_file_path in zip(about_locations, about_file_paths):
+            yield load_about(location, about_file_path, cache_dir,
+                             path_index=path_index, min_severity=min_severity)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # send work in chunks to amortize the inter-process communication costs
+    chunksize = max(1, min(64, len(about_locations) // (jobs * 4)))
+    items = list(zip(about_locations, about_file_paths))
+    chunks = (items[i:i + chunksize] for i in range(0, len(items), chunksize))
+    load_chunk = partial(load_abouts_in_worker, cache_dir=cache_dir,
+                         min_severity=min_severity)
+    pool_kwargs = {}
+    if sys.version_info >= (3, 7):
+        pool_kwargs.update(initializer=set_worker_path_index, initargs=(path_index,))
+    else:
+        set_worker_path_index(path_index)
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, **pool_kwargs) as executor:
+            # only keep a few chunks in flight such that the loaded About
+            # objects are not buffered for the whole tree
+            for abouts in bounded_map(executor, load_chunk, chunks, jobs * 2):
+                for about in abouts:
+                    yield about
+    finally:
+        set_worker_path_index(None)
+
+
+def count_suppressed_errors(abouts):
+    """
+    Return a Counter of the number of errors by severity that were not created
+    because they were below the minimum severity when loading the `abouts`
+    About objects.
+    """
+    counts = Counter()
+    for about in abouts:
+        counts.update(about.suppressed_errors)
+    return counts
 
 
 def get_field_names(abouts):
@@ -1153,119 +1675,301 @@ def get_field_names(abouts):
     Given a list of About objects, return a list of any field names that exist
     in any object, including custom fields.
     """
-    fields = []
-    # fields.append(About.ABOUT_FILE_PATH_ATTR)
-
-    standard_fields = About().fields.keys()
-    standards = []
-    for a in abouts:
-        for name, field in a.fields.items():
-            if field.required:
-                if name not in standards:
-                    standards.append(name)
-            else:
-                if field.present:
-                    if name not in standards:
-                        standards.append(name)
-    # resort standard fields in standard order
-    # which is a tad complex as this is a predefined order
-    sorted_std = []
-    for fn in standard_fields:
-        if fn in standards:
-            sorted_std.append(fn)
-    fields.extend(sorted_std)
-
-    customs = []
+    field_names = FieldNames()
     for a in abouts:
-        for name, field in a.custom_fields.items():
-            if field.has_content:
-                if name not in customs:
-                    customs.append(name)
-    # always sort custom fields list by name
-    customs.sort()
-    fields.extend(customs)
+        field_names.add(a)
+    return field_names.names
+
+
+class FieldNames(object):
+    """
+    The ordered set of the field names of About objects accumulated as About
+    objects are added: the names of the required or present standard fields in
+    the standard order followed by the names of the custom fields with a
+    content sorted by name.
+    """
 
-    return fields
+    def __init__(self, schema=None):
+        self.schema = schema or About.schema
+        # set of all the field names added so far
+        self.seen = set()
+        # sorted list of the custom field names added so far
+        self.customs = []
+        # list of field names computed only when a new name was added
+        self._names = None
 
+    def add(self, about):
+        """
+        Add the field names of an `about` About object.
+        """
+        seen = self.seen
+        # absent fields that were never created are neither required nor present
+        for name, field in about.fields.created.items():
+            if name not in seen and (field.required or field.present):
+                seen.add(name)
+                self._names = None
+        for name, field in about.custom_fields.items():
+            if name not in seen and field.has_content:
+                seen.add(name)
+                bisect.insort(self.customs, name)
+                self._names = None
+
+    @property
+    def names(self):
+        """
+        Return the list of field names.
+        """
+        if self._names is None:
+            seen = self.seen
+            names = [name for name in self.schema.names if name in seen]
+            names.extend(self.customs)
+            self._names = names
+        return self._names
+
+
+# names of the license fields grouped in the "licenses" list of a JSON item
+LICENSE_FIELDS = ('license_key', 'license_name', 'license_file', 'license_url')
 
-def about_object_to_list_of_dictionary(abouts):
+
+def get_inventory_resource(about):
     """
-    Convert About objects to a list of dictionaries
+    Return the about_resource path of an `about` About object as written in an
+    inventory or None if there is no about_resource. This is the path from the
+    inventory root such as "/about/Jinja2-2.7.3-py2-none-any.whl" or "/about/"
+    for an about_resource of "." in about/about.ABOUT.
     """
-    serialized = []
-    for about in abouts:
-        # Restore the *_file value to the original value
-        # The *_file's original_value may be parsed (i.e. split(',))
-        # for validation purpose.  
-        about.license_file.value = about.license_file.original_value
-        about.notice_file.value = about.notice_file.original_value 
-        about.changelog_file.value = about.changelog_file.original_value
-        about.author_file.value = about.author_file.original_value
-
-        # TODO: this wholeblock should be under sd_dict()
-        ad = about.as_dict()
-
-        # Update the 'about_resource' field with the relative path
-        # from the output location
-        try:
-            if ad['about_resource']:
-                if 'about_file_path' in ad.keys():
-                    afp = ad['about_file_path']
-                    afp_parent = posixpath.dirname(afp)
-                    afp_parent = '/' + afp_parent if not afp_parent.startswith('/') else afp_parent
-                    about_resource = ad['about_resource']
-                    for resource in about_resource:
-                        updated_about_resource = posixpath.normpath(posixpath.join(afp_parent, resource))
-                        if resource == u'.':
-                            if not updated_about_resource == '/': 
-                                updated_about_resource = updated_about_resource + '/'
-                    ad['about_resource'] = OrderedDict([(updated_about_resource, None)])
-                    del ad['about_file_path']
-                serialized.append(ad)
-        except Exception as e:
-            # The missing required field, about_resource, has already been checked
-            # and the error has already been logged.
-            pass
-    return serialized
+    resources = about.about_resource.value
+    if not resources:
+        return
+    if isinstance(resources, basestring):
+        resources = [resources]
+    # only one resource is supported: the last one is used
+    resource = list(resources)[-1]
+    parent = posixpath.dirname(about.about_file_path or '')
+    if not parent.startswith('/'):
+        parent = '/' + parent
+    path = posixpath.normpath(posixpath.join(parent, resource))
+    if resource == u'.' and path != '/':
+        path += '/'
+    return path
+
+
+def iter_inventory_fields(about):
+    """
+    Yield (name, value) tuples for the fields with a value of an `about` About
+    object as written in an inventory: the standard fields in the standard
+    order followed by the custom fields. The about_resource is a path from the
+    inventory root and file fields have their original value. Yield nothing if
+    there is no about_resource: this is reported when validating.
+
+    The About object is not modified.
+    """
+    resource = get_inventory_resource(about)
+    if not resource:
+        return
+    yield About.ABOUT_RESOURCE_ATTR, resource
+
+    schema = about.fields.schema
+    created = about.fields.created
+    for name in schema.names:
+        field = created.get(name)
+        # fields that were never created have no value
+        if field is None or name == About.ABOUT_RESOURCE_ATTR:
+            continue
+        if name in schema.file_fields:
+            # the value of file fields is parsed for validation
+            value = field.original_value
+        else:
+            value = field.serialized_value()
+        if value:
+            yield name, value
+
+    for field in about.custom_fields.values():
+        value = field.serialized_value()
+        if value:
+            yield field.name, value
+
+
+def as_list(value):
+    """
+    Return a list of values given a field `value` that is a list, a mapping of
+    path to location or text, a string or None.
+    """
+    if not value:
+        return []
+    if isinstance(value, dict):
+        return list(value.keys())
+    if isinstance(value, basestring):
+        return [value]
+    return list(value)
+
+
+def get_licenses(about):
+    """
+    Return a list of (key, name, file, url) tuples for the licenses of an
+    `about` About object.
+    """
+    return list(zip_longest(
+        as_list(about.license_key.value),
+        as_list(about.license_name.value),
+        as_list(about.license_file.value),
+        as_list(about.license_url.value),
+    ))
+
 
+def get_csv_row(about):
+    """
+    Return a CSV inventory row OrderedDict for an `about` About object or None
+    if it has no about_resource. Lists are written one value per line.
+    """
+    row = OrderedDict()
+    for name, value in iter_inventory_fields(about):
+        if isinstance(value, list):
+            value = u'\n'.join(value)
+        row[name] = value
+    return row or None
 
-def write_output(abouts, location, format):  # NOQA
+
+def get_json_item(about):
+    """
+    Return a JSON inventory item OrderedDict for an `about` About object or
+    None if it has no about_resource. The license fields are grouped in a
+    list of licenses with a key, name, file and url.
     """
-    Write a CSV/JSON file at location given a list of About objects.
+    item = OrderedDict()
+    has_licenses = False
+    for name, value in iter_inventory_fields(about):
+        if name in LICENSE_FIELDS:
+            has_licenses = True
+        else:
+            item[name] = value
+    if not item:
+        return
+
+    if has_licenses:
+        licenses = []
+        for lic in get_licenses(about):
+            lic_dict = OrderedDict()
+            for key, value in zip(('key', 'name', 'file', 'url'), lic):
+                if value:
+                    lic_dict[key] = value
+            licenses.append(lic_dict)
+        item['licenses'] = licenses
+    return item
+
+
+def write_output(abouts, location, format, field_names=None):  # NOQA
+    """
+    Write a CSV/JSON/SQLite file at location given an iterable of About objects.
+    For CSV, use the `field_names` list of columns if provided or the names of
+    the fields present in any About object otherwise.
+    CSV and JSON files with a .gz, .bz2 or .xz extension are compressed.
     Return a list of Error objects.
     """
-    about_dicts = about_object_to_list_of_dictionary(abouts)
     location = add_unc(location)
     if format == 'csv':
-        errors = save_as_csv(location, about_dicts, get_field_names(abouts))
-    else:
-        errors = save_as_json(location, about_dicts)
-    return errors
+        return save_abouts_as_csv(location, abouts, field_names)
+    if format == 'sqlite':
+        from attributecode.database import save_abouts_as_sqlite
+        return save_abouts_as_sqlite(location, abouts)
+    return save_abouts_as_json(location, abouts, json_lines=format == 'jsonl')
 
 
-def save_as_json(location, about_dicts):
-    mode = 'w'
-    if python2:
-        mode = 'wb'
-    with io.open(location, mode=mode) as output_file:
-        data = util.format_about_dict_for_json_output(about_dicts)
-        output_file.write(json.dumps(data, indent=2))
+def save_abouts_as_json(location, abouts, json_lines=False):
+    """
+    Write a JSON file at `location` given an iterable of About objects, writing
+    items as About objects are received. Write JSON Lines with one JSON object
+    per line instead of a JSON array if `json_lines` is True.
+    Return a list of errors.
+    """
+    items = (get_json_item(about) for about in abouts)
+    return write_json_items(location, (item for item in items if item), json_lines)
+
+
+def write_json_items(location, items, json_lines=False):
+    """
+    Write an iterable of JSON `items` at `location` one item at a time, either
+    as a JSON array indented the same as json.dumps(items, indent=2) or as JSON
+    Lines if `json_lines` is True. Return a list of errors.
+    """
+    # the JSON is ASCII-only
+    with util.open_text_file(location, 'w') as output_file:
+        if json_lines:
+            for item in items:
+                output_file.write(json.dumps(item) + '\n')
+            return []
+
+        encoder = json.JSONEncoder(indent=2)
+        separator = encoder.item_separator + '\n  '
+        output_file.write('[')
+        first = True
+        for item in items:
+            # JSON strings cannot contain a newline: this indents every line
+            output_file.write(('\n  ' if first else separator)
+                              + encoder.encode(item).replace('\n', '\n  '))
+            first = False
+        output_file.write(']' if first else '\n]')
+    return []
+
+
+def write_csv_row(writer, row, about_file_path):
+    """
+    Write a `row` dict of the `about_file_path` ABOUT file with a csv.DictWriter
+    `writer`. Return a list of errors.
+    """
+    # See https://github.com/dejacode/about-code-tool/issues/167
+    try:
+        writer.writerow(row)
+    except Exception as e:
+        msg = u'Generation skipped for %(about_file_path)s : %(e)s' % locals()
+        return [Error(CRITICAL, msg, code='output-error', path=about_file_path)]
     return []
 
 
-def save_as_csv(location, about_dicts, field_names):
+def save_abouts_as_csv(location, abouts, field_names=None):
+    """
+    Write a CSV file at `location` given an iterable of About objects, writing
+    rows as About objects are received such that they do not need to be all
+    kept in memory. Return a list of errors.
+
+    If a `field_names` list of columns is provided, rows are written directly
+    with only these columns.
+    Otherwise, the columns are collected from the About objects while their
+    rows are spooled to a temporary file. The header is then written once all
+    the columns are known, followed by the spooled rows.
+    """
     errors = []
-    with io.open(location, mode='w', encoding='utf-8', newline='') as output_file:
-        writer = csv.DictWriter(output_file, field_names)
-        writer.writeheader()
-        csv_formatted_list = util.format_about_dict_for_csv_output(about_dicts)
-        for row in csv_formatted_list:
-            # See https://github.com/dejacode/about-code-tool/issues/167
-            try:
-                writer.writerow(row)
-            except Exception as e:
-                msg = u'Generation skipped for ' + row['about_file_path'] + u' : ' + str(e)
-                errors.append(Error(CRITICAL, msg))
+    if field_names:
+        with util.open_text_file(location, 'w', newline='') as output_file:
+            # fields that are not in the provided columns are not written
+            writer = csv.DictWriter(output_file, field_names, extrasaction='ignore')
+            writer.writeheader()
+            for about in abouts:
+                row = get_csv_row(about)
+                if row:
+                    errors.extend(write_csv_row(writer, row, about.about_file_path))
+        return errors
+
+    collected_names = FieldNames()
+    with tempfile.TemporaryFile() as spool:
+        for about in abouts:
+            collected_names.add(about)
+            row = get_csv_row(about)
+            if row:
+                spooled = about.about_file_path, row
+                pickle.dump(spooled, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        field_names = collected_names.names
+
+        spool.seek(0)
+        with util.open_text_file(location, 'w', newline='') as output_file:
+            writer = csv.DictWriter(output_file, field_names)
+            writer.writeheader()
+            while True:
+                try:
+                    about_file_path, row = pickle.load(spool)
+                except EOFError:
+                    break
+                errors.extend(write_csv_row(writer, row, about_file_path))
     return errors
 
 
@@ -27,6 +27,7 @@ from attributecode import CRITICAL
 from attributecode import Error
 from attributecode import saneyaml
 from attributecode.util import csv
+from attributecode.util import open_text_file
 from attributecode.util import python2
 from attributecode.util import replace_tab_with_spaces
 
@@ -40,7 +41,8 @@ else:  # pragma: nocover
 def transform_csv_to_csv(location, output, transformer):
     """
     Read a CSV file at `location` and write a new CSV file at `output`. Apply
-    transformations using the `transformer` Tranformer.
+    transformations using the `transformer` Tranformer. Files with a .gz, .bz2
+    or .xz extension are decompressed or compressed on the fly.
     Return a list of Error objects.
     """
     if not transformer:
@@ -161,9 +163,8 @@ class Transformer(object):
     # called by attr after the __init__()
     def __attrs_post_init__(self, *args, **kwargs):
         from attributecode.model import About
-        about = About()
-        self.essential_columns = list(about.required_fields)
-        self.standard_columns = [f.name for f in about.all_fields()]
+        self.essential_columns = list(About.required_fields)
+        self.standard_columns = list(About.schema.names)
 
     @classmethod
     def default(cls):
@@ -260,7 +261,7 @@ def read_csv_rows(location):
     """
     Yield rows (as a list of values) from a CSV file at `location`.
     """
-    with io.open(location, encoding='utf-8', errors='replace') as csvfile:
+    with open_text_file(location, errors='replace') as csvfile:
         reader = csv.reader(csvfile)
         for row in reader:
             yield row
@@ -271,7 +272,7 @@ def write_csv(location, data, column_names):  # NOQA
     Write a CSV file at `location` the `data` list of ordered dicts using the
     `column_names`.
     """
-    with io.open(location, 'w', encoding='utf-8', newline='\n') as csvfile:
+    with open_text_file(location, 'w', newline='\n') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=column_names)
         writer.writeheader()
         writer.writerows(data)
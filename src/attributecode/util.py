@@ -17,8 +17,10 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import codecs
+from collections import Counter
+from collections import deque
 from collections import OrderedDict
+import io
 import json
 import ntpath
 import os
@@ -29,6 +31,7 @@ import string
 import sys
 
 from attributecode import CRITICAL
+from attributecode import NOTSET
 from attributecode import WARNING
 from attributecode import Error
 
@@ -40,6 +43,11 @@ if python2:  # pragma: nocover
 else:  # pragma: nocover
     from itertools import zip_longest  # NOQA
 
+if python2:  # pragma: nocover
+    from scandir import scandir  # NOQA
+else:  # pragma: nocover
+    from os import scandir  # NOQA
+
 if python2:  # pragma: nocover
     from backports import csv  # NOQA
     # monkey patch backports.csv until bug is fixed
@@ -127,28 +135,250 @@ def check_file_names(paths):
     return errors
 
 def wrap_boolean_value(context):
-    updated_context = ''
+    """
+    Return the `context` ABOUT text with the values of boolean fields wrapped
+    in quotes.
+    """
+    updated_lines = []
     for line in context.splitlines():
-        """
-        wrap the boolean value in quote
-        """
-        key = line.partition(':')[0]
-        value = line.partition(':')[2].strip()
-        value = '"' + value + '"'
-        if key in boolean_fields and not value == "":
-            updated_context += key + ': ' + value + '\n'
-        else:
-            updated_context += line + '\n'
-    return updated_context
+        key, _, value = line.partition(':')
+        if key in boolean_fields:
+            line = key + ': "' + value.strip() + '"'
+        updated_lines.append(line)
+    updated_lines.append('')
+    return '\n'.join(updated_lines)
+
 
 def replace_tab_with_spaces(context):
-    updated_context = ''
+    """
+    Return the `context` text with each tab replaced by 4 spaces.
+    """
+    lines = context.splitlines()
+    lines.append('')
+    return '\n'.join(lines).replace('\t', '    ')
+
+
+def normalize_about_text(context):
+    """
+    Return the `context` ABOUT text normalized for loading with saneyaml in a
+    single pass: this is the same as replace_tab_with_spaces() applied to
+    wrap_boolean_value().
+
+    The 'Yes' and 'No' values are converted to True and False by the YAML
+    loader: the values of boolean fields are wrapped in quotes to prevent
+    this conversion. Tabs are not valid YAML indentation: these are replaced
+    by 4 spaces.
+    """
+    updated_lines = []
     for line in context.splitlines():
+        key, _, value = line.partition(':')
+        if key in boolean_fields:
+            line = key + ': "' + value.strip() + '"'
+        updated_lines.append(line)
+    updated_lines.append('')
+    updated_context = '\n'.join(updated_lines)
+    if '\t' in updated_context:
+        updated_context = updated_context.replace('\t', '    ')
+    return updated_context
+
+
+# characters that YAML does not accept in a document
+yaml_non_printable = re.compile(
+    '[^\x09\x0A\x0D\x20-\x7E\x85\xA0-\uD7FF\uE000-\uFFFD]').search
+
+# a top-level field name and its optional value: this subset of YAML keys is
+# enough for all the standard field names
+about_key_value = re.compile(r'^([A-Za-z_][A-Za-z0-9_\-]*):(?: +(.*))?$').match
+
+# characters that cannot start a YAML plain scalar
+yaml_indicators = tuple('-?:,[]{}#&*!|>\'"%@`=')
+
+# YAML 1.1 plain scalars that saneyaml loads as booleans
+yaml_boolean = re.compile(
+    '^(?:yes|Yes|YES|no|No|NO|true|True|TRUE|false|False|FALSE|on|On|ON|off|Off|OFF)$').match
+yaml_boolean_values = {
+    'yes': True, 'no': False, 'true': True, 'false': False, 'on': True, 'off': False}
+
+
+def is_plain_value(value):
+    """
+    Return True if the non-empty `value` string is a simple YAML plain scalar.
+    """
+    return not (value.startswith(yaml_indicators)
+                or ': ' in value
+                or ' #' in value
+                or value.endswith(':'))
+
+
+def fast_load_about(text):
+    """
+    Return an ordered dict of fields loaded from an ABOUT file `text` or None
+    if this text is not supported by this fast loader and must be loaded with
+    saneyaml instead.
+
+    Only the common subset of the ABOUT format is supported: top-level "name:
+    value" fields on a single line, "|" literal blocks and lists of simple
+    "name: value" mappings such as "licenses". The returned data are the
+    same as saneyaml.load() on the text processed with normalize_about_text().
+    """
+    if text.startswith('\ufeff') or yaml_non_printable(text):
+        return
+    # YAML merge keys are left to saneyaml which rejects them
+    if '<<' in text:
+        return
+
+    lines = text.replace('\t', '    ').splitlines()
+    count = len(lines)
+
+    def next_content(i):
         """
-        Replace tab with 4 spaces
+        Return the index of the first non-blank line starting at `i`.
         """
-        updated_context += line.replace('\t', '    ') + '\n'
-    return updated_context
+        while i < count and not lines[i].strip():
+            i += 1
+        return i
+
+    fields = OrderedDict()
+    i = 0
+    while i < count:
+        line = lines[i]
+        i += 1
+        if not line.strip() or line.startswith('#'):
+            continue
+
+        match = about_key_value(line)
+        if not match:
+            return
+        key, value = match.groups()
+        if key in fields or yaml_boolean(key):
+            return
+        value = value and value.rstrip() or ''
+        nxt = next_content(i)
+        continued = nxt < count and lines[nxt].startswith((' ', '-'))
+
+        if key in boolean_fields:
+            # wrap_boolean_value() quotes these values: this is a plain string
+            # unless escapes or quotes are used
+            if continued or '"' in value or '\\' in value:
+                return
+        elif value == '|':
+            value, i = fast_load_literal(lines, i)
+            if value is None:
+                return
+        elif not value:
+            if continued:
+                value, i = fast_load_sequence(lines, nxt)
+                if value is None:
+                    return
+        elif continued or not is_plain_value(value):
+            return
+        elif yaml_boolean(value):
+            value = yaml_boolean_values[value.lower()]
+        fields[key] = value
+
+    if fields:
+        return fields
+
+
+def fast_load_literal(lines, start):
+    """
+    Return a tuple of (text, next line index) for a YAML "|" literal block
+    starting at the `start` index in a `lines` list. The text is None if the
+    block is not supported.
+    """
+    block = []
+    indent = None
+    i = start
+    count = len(lines)
+    while i < count:
+        line = lines[i]
+        if not line.strip():
+            # leading empty lines or trailing spaces are not supported
+            if indent is None or len(line) > indent:
+                return None, i
+            block.append('')
+            i += 1
+            continue
+        line_indent = len(line) - len(line.lstrip(' '))
+        if indent is None:
+            if not line_indent:
+                break
+            indent = line_indent
+        elif line_indent < indent:
+            break
+        block.append(line[indent:])
+        i += 1
+
+    if i < count and lines[i].startswith((' ', '#')):
+        return None, i
+
+    # clip chomping: keep a single trailing new line
+    while block and not block[-1]:
+        block.pop()
+    if not block:
+        return '', i
+    return '\n'.join(block) + '\n', i
+
+
+def fast_load_sequence(lines, start):
+    """
+    Return a tuple of (list of ordered dicts, next line index) for a YAML
+    sequence of simple mappings starting at the `start` index in a `lines`
+    list. The list is None if the sequence is not supported.
+    """
+    if not lines[start].lstrip(' ').startswith('- '):
+        return None, start
+
+    items = []
+    item = None
+    seq_indent = len(lines[start]) - len(lines[start].lstrip(' '))
+    map_indent = None
+    i = start
+    count = len(lines)
+    while i < count:
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        line_indent = len(line) - len(line.lstrip(' '))
+        if line_indent < seq_indent:
+            break
+        content = line[line_indent:]
+        if line_indent == seq_indent:
+            if not content.startswith('- '):
+                if seq_indent:
+                    return None, i
+                # this is the next top-level field
+                break
+            content = content[2:]
+            stripped = content.lstrip(' ')
+            map_indent = seq_indent + 2 + len(content) - len(stripped)
+            content = stripped
+            item = OrderedDict()
+            items.append(item)
+        elif line_indent != map_indent:
+            return None, i
+
+        match = about_key_value(content)
+        if not match:
+            return None, i
+        key, value = match.groups()
+        value = value and value.rstrip() or ''
+        if key in item or yaml_boolean(key):
+            return None, i
+        if value:
+            if not is_plain_value(value):
+                return None, i
+            if yaml_boolean(value):
+                value = yaml_boolean_values[value.lower()]
+        item[key] = value
+        i += 1
+
+    if i < count and lines[i].startswith((' ', '#')):
+        return None, i
+    return items, i
+
 
 # TODO: rename to normalize_path
 def get_absolute(location):
@@ -181,15 +411,178 @@ def get_locations(location):
                 yield posixpath.join(bd, name)
 
 
-def get_about_locations(location):
+def get_about_locations(location, workers=1, sort=False, path_index=None):
     """
     Return a list of locations of ABOUT files given the `location` of a
     a file or a directory tree containing ABOUT files.
     File locations are normalized using posix path separators.
+
+    Directories are scanned using up to `workers` threads. If `sort` is True,
+    return the locations sorted, otherwise they are yielded as they are found.
+    If a `path_index` PathIndex is provided, add all the scanned directories
+    to this index.
+    """
+    locations = walk_about_locations(
+        location, workers=workers, path_index=path_index)
+    if sort:
+        return iter(sorted(locations))
+    return locations
+
+
+def walk_about_locations(location, workers=1, path_index=None):
+    """
+    Yield locations of ABOUT files given the `location` of a file or a
+    directory tree containing ABOUT files. File locations are normalized using
+    posix path separators.
+
+    With more than one `workers`, directories are scanned concurrently in a
+    pool of threads and ABOUT files locations are yielded as they are found
+    in no particular order. Otherwise the tree is walked top-down in the same
+    order as os.walk(). Scanned directories are added to the `path_index`
+    PathIndex if provided.
+    """
+    location = add_unc(location)
+    location = get_absolute(location)
+    assert os.path.exists(location)
+
+    if os.path.isfile(location):
+        if is_about_file(location):
+            yield location
+        return
+
+    if not workers or workers <= 1:
+        directories = [location]
+        while directories:
+            about_locations, subdirs = scan_about_directory(
+                directories.pop(), path_index)
+            for about_location in about_locations:
+                yield about_location
+            # keep the os.walk top-down ordering
+            directories.extend(reversed(subdirs))
+        return
+
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import wait
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set([executor.submit(scan_about_directory, location, path_index)])
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                about_locations, subdirs = future.result()
+                for subdir in subdirs:
+                    pending.add(executor.submit(scan_about_directory, subdir, path_index))
+                for about_location in about_locations:
+                    yield about_location
+
+
+def scan_about_directory(location, path_index=None):
+    """
+    Return a tuple of (list of ABOUT file locations, list of sub-directory
+    locations) found directly in the directory at `location`. Add the names
+    found in this directory to the `path_index` PathIndex if provided.
+
+    Like os.walk(), symlinked directories are not returned as sub-directories
+    and unreadable directories are ignored. The name suffix is checked before
+    building a path such that no path is created for non-ABOUT files.
+    """
+    about_locations = []
+    subdirs = []
+    try:
+        entries = list(scandir(location))
+    except OSError:
+        return about_locations, subdirs
+
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif entry.name.lower().endswith('.about'):
+            about_locations.append(to_posix(entry.path))
+
+    if path_index is not None:
+        # do not trust symlinks: these may be broken
+        names = set()
+        symlinks = set()
+        for entry in entries:
+            if entry.is_symlink():
+                symlinks.add(entry.name)
+            else:
+                names.add(entry.name)
+        path_index.add_directory(location, names, symlinks)
+    return about_locations, subdirs
+
+
+def bounded_map(executor, func, iterable, window):
+    """
+    Yield the results of calling `func` on each item of the `iterable` with
+    the `executor` in the order of the `iterable`. Unlike executor.map(), at
+    most `window` calls are submitted and not yet yielded at any time: the
+    `iterable` is consumed and results are held in memory only as results are
+    yielded.
+    """
+    window = max(1, window)
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+class PathIndex(object):
+    """
+    An index of the names found in the directories of a walked tree used to
+    check if a path exists without a stat system call.
+
+    A path that is not in a walked directory, a symlink or a path that is not
+    found on a case-insensitive file system is checked with a stat.
     """
-    for loc in get_locations(location):
-        if is_about_file(loc):
-            yield loc
+
+    def __init__(self, case_sensitive=None):
+        # mapping of {posix directory location: (set of names, set of symlink
+        # names)}
+        self.directories = {}
+        if case_sensitive is None:
+            case_sensitive = not (on_windows or sys.platform == 'darwin')
+        self.case_sensitive = case_sensitive
+
+    def add_directory(self, location, names, symlinks=()):
+        """
+        Add the directory at `location` that contains a `names` set of file
+        and directory names and a `symlinks` set of symlink names.
+        """
+        self.directories[self.key(location)] = names, set(symlinks)
+
+    @staticmethod
+    def key(location):
+        location = to_posix(location)
+        if location.startswith(UNC_PREFIX_POSIX):
+            location = location[len(UNC_PREFIX_POSIX):]
+        return location.rstrip('/') or '/'
+
+    def exists(self, location):
+        """
+        Return True if a file or directory exists at `location`.
+        """
+        location = self.key(location)
+        if location in self.directories:
+            return True
+        parent, name = posixpath.split(location)
+        directory = self.directories.get(parent)
+        if directory is not None:
+            names, symlinks = directory
+            if name in names:
+                return True
+            if self.case_sensitive and name not in symlinks:
+                return False
+        return os.path.exists(add_unc(location))
 
 
 def get_relative_path(base_loc, full_loc):
@@ -265,32 +658,126 @@ def resource_name(path):
 
 
 
+# extensions of the compressed inventory files
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz',)
+
+
+def get_compression(location):
+    """
+    Return the compressed file extension of `location` such as ".gz" or None
+    if this is not a compressed file.
+    """
+    lowered = location.lower()
+    for extension in COMPRESSED_EXTENSIONS:
+        if lowered.endswith(extension):
+            return extension
+
+
+def strip_compression(location):
+    """
+    Return `location` stripped from its compressed file extension if any such
+    that "inventory.csv.gz" becomes "inventory.csv".
+    """
+    extension = get_compression(location)
+    if extension:
+        return location[:-len(extension)]
+    return location
+
+
+def open_text_file(location, mode='r', errors='strict', newline=None):
+    """
+    Return a UTF-8 text file object open for reading (with `mode` "r") or for
+    writing (with `mode` "w") the file at `location`. A file with a .gz, .bz2
+    or .xz extension is decompressed when read or compressed when written on
+    the fly with a gzip, bzip2 or xz codec.
+    """
+    extension = get_compression(location)
+    if not extension:
+        return io.open(location, mode, encoding='utf-8', errors=errors, newline=newline)
+
+    if extension == '.gz':
+        import gzip
+        binary = gzip.open(location, mode + 'b')
+    elif python2:  # pragma: nocover
+        raise Exception(
+            'Compressed %(extension)s files are not supported on Python 2: '
+            '%(location)s' % locals())
+    elif extension == '.bz2':
+        import bz2
+        binary = bz2.open(location, mode + 'b')
+    else:
+        import lzma
+        binary = lzma.open(location, mode + 'b')
+    return io.TextIOWrapper(binary, encoding='utf-8', errors=errors, newline=newline)
+
+
+class CsvRows(object):
+    """
+    An iterable of the rows of the CSV file at `location` as ordered
+    dictionaries keyed by lowercased column name. The CSV can be compressed
+    with gzip, bzip2 or xz.
+
+    The rows are read from the file each time this is iterated such that only
+    one row is kept in memory. The original column names of the header are
+    available as `columns` once the iteration has started.
+
+    The problems found in the last iteration are available as a list of
+    `errors`: text that is not valid UTF-8 and rows with more values than
+    there are columns. Invalid bytes are replaced by U+FFFD and the extra
+    values of a row are dropped.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.columns = None
+        self.errors = []
+
+    def __iter__(self):
+        self.errors = []
+        with open_text_file(self.location, errors='replace', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            self.columns = next(reader, [])
+            if any(u'\ufffd' in column for column in self.columns):
+                self.errors.append(self._invalid_text_error(reader.line_num))
+            # convert all the column keys to lower case once
+            keys = [column.lower() for column in self.columns]
+            width = len(keys)
+            for values in reader:
+                # skip empty lines like a csv.DictReader
+                if not values:
+                    continue
+                if any(u'\ufffd' in value for value in values):
+                    self.errors.append(self._invalid_text_error(reader.line_num))
+                if len(values) > width:
+                    msg = ('Line %d of %s has %d values but there are only '
+                           '%d columns: the extra values are ignored.'
+                           % (reader.line_num, self.location, len(values), width))
+                    self.errors.append(Error(CRITICAL, msg))
+                elif len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                yield OrderedDict(zip(keys, values))
+
+    def _invalid_text_error(self, line_num):
+        msg = ('Line %d of %s is not valid UTF-8 text.' % (line_num, self.location))
+        return Error(CRITICAL, msg)
+
+
 def load_csv(location):
     """
     Read CSV at `location`, return a list of ordered dictionaries, one
-    for each row.
-    """
-    results = []
-    # FIXME: why ignore encoding errors here?
-    with codecs.open(location, mode='rb', encoding='utf-8',
-                     errors='ignore') as csvfile:
-        for row in csv.DictReader(csvfile):
-            # convert all the column keys to lower case
-            updated_row = OrderedDict(
-                [(key.lower(), value) for key, value in row.items()]
-            )
-            results.append(updated_row)
-    return results
+    for each row. The CSV can be compressed with gzip, bzip2 or xz.
+    """
+    return list(CsvRows(location))
 
 
 def load_json(location):
     """
     Read JSON file at `location` and return a list of ordered dicts, one for
-    each entry.
+    each entry. The JSON can be compressed with gzip, bzip2 or xz.
     """
     # FIXME: IMHO we should know where the JSON is from and its shape
     # FIXME use: object_pairs_hook=OrderedDict
-    with open(location) as json_file:
+    with open_text_file(location) as json_file:
         results = json.load(json_file)
 
     # If the loaded JSON is not a list,
@@ -336,9 +823,7 @@ def load_json(location):
     # }
     # FIXME: this is too clever and complex... IMHO we should not try to guess the format.
     # instead a command line option should be provided explictly to say what is the format
-    if isinstance(results, list):
-        results = sorted(results)
-    else:
+    if not isinstance(results, list):
         if u'aboutcode_manager_notice' in results:
             results = results['components']
         elif u'scancode_notice' in results:
@@ -485,70 +970,33 @@ def ungroup_licenses(licenses):
     return lic_key, lic_name, lic_file, lic_url
 
 
-# FIXME: add docstring
-def format_about_dict_for_csv_output(about_dictionary_list):
-    csv_formatted_list = []
-    for element in about_dictionary_list:
-        row_list = OrderedDict()
-        for key in element:
-            if element[key]:
-                if isinstance(element[key], list):
-                    row_list[key] = u'\n'.join((element[key]))
-                elif key == u'about_resource':
-                    row_list[key] = u'\n'.join((element[key].keys()))
-                else:
-                    row_list[key] = element[key]
-        csv_formatted_list.append(row_list)
-    return csv_formatted_list
+class BoundedCache(object):
+    """
+    A cache of computed values holding at most `max_size` items: the oldest
+    items are evicted first when it is full.
+    """
 
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.items = OrderedDict()
 
-# FIXME: add docstring
-def format_about_dict_for_json_output(about_dictionary_list):
-    licenses = ['license_key', 'license_name', 'license_file', 'license_url']
-    json_formatted_list = []
-    for element in about_dictionary_list:
-        row_list = OrderedDict()
-        # FIXME: aboid using parallel list... use an object instead
-        license_key = []
-        license_name = []
-        license_file = []
-        license_url = []
-
-        for key in element:
-            if element[key]:
-                # The 'about_resource' is an ordered dict
-                if key == 'about_resource':
-                    row_list[key] = list(element[key].keys())[0]
-                elif key in licenses:
-                    if key == 'license_key':
-                        license_key = element[key]
-                    elif key == 'license_name':
-                        license_name = element[key]
-                    elif key == 'license_file':
-                        license_file = element[key]
-                    elif key == 'license_url':
-                        license_url = element[key]
-                else:
-                    row_list[key] = element[key]
-
-        # Group the same license information in a list
-        license_group = list(zip_longest(license_key, license_name, license_file, license_url))
-        if license_group:
-            licenses_list = []
-            for lic_group in license_group:
-                lic_dict = OrderedDict()
-                if lic_group[0]:
-                    lic_dict['key'] = lic_group[0]
-                if lic_group[1]:
-                    lic_dict['name'] = lic_group[1]
-                if lic_group[2]:
-                    lic_dict['file'] = lic_group[2]
-                if lic_group[3]:
-                    lic_dict['url'] = lic_group[3]
-                licenses_list.append(lic_dict)
-            row_list['licenses'] = licenses_list
-        json_formatted_list.append(row_list)
-    return json_formatted_list
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for a `key` or a value computed with
+        `compute(key)` and cached if not cached yet.
+        """
+        try:
+            return self.items[key]
+        except KeyError:
+            pass
+        value = compute(key)
+        if len(self.items) >= self.max_size:
+            self.items.popitem(last=False)
+        self.items[key] = value
+        return value
+
+    def clear(self):
+        self.items.clear()
 
 
 def unique(sequence):
@@ -559,10 +1007,18 @@ def unique(sequence):
     >>> unique([1, 5, 3, 5])
     [1, 5, 3]
     """
+    seen = set()
     deduped = []
     for item in sequence:
-        if item not in deduped:
-            deduped.append(item)
+        try:
+            if item in seen:
+                continue
+            seen.add(item)
+        except TypeError:
+            # unhashable items such as dicts or lists
+            if item in deduped:
+                continue
+        deduped.append(item)
     return deduped
 
 
@@ -574,6 +1030,93 @@ def filter_errors(errors, minimum_severity=WARNING):
     return unique([e for e in errors if e.severity >= minimum_severity])
 
 
+class ErrorFilter(object):
+    """
+    Select the errors to report given a `min_severity` threshold. Errors below
+    this threshold are only counted by severity in the `suppressed` Counter:
+    the caller should not create them at all.
+    """
+
+    def __init__(self, min_severity=NOTSET):
+        self.min_severity = min_severity or NOTSET
+        self.suppressed = Counter()
+
+    def reports(self, severity):
+        """
+        Return True if an error with `severity` should be created and
+        reported. Otherwise count it as suppressed and return False.
+        """
+        if severity >= self.min_severity:
+            return True
+        self.suppressed[severity] += 1
+        return False
+
+
+def is_reported(severity, error_filter=None):
+    """
+    Return True if an error with `severity` should be created and reported
+    given an optional `error_filter` ErrorFilter.
+    """
+    return error_filter is None or error_filter.reports(severity)
+
+
+class ErrorSummary(object):
+    """
+    Aggregate Error objects in groups of similar errors with an occurrence
+    count instead of keeping every Error. Errors with a code are grouped by
+    severity, code and field name. Other errors are grouped by severity and
+    message without the ABOUT file path. The first Error of a group is kept as
+    an example. Like with unique(), an Error equal to an Error that was
+    already counted is ignored.
+    """
+
+    def __init__(self, errors=()):
+        # {group key: [first Error, occurrences count]}
+        self.groups = OrderedDict()
+        # the distinct Errors counted so far
+        self.seen = set()
+        self.extend(errors)
+
+    @staticmethod
+    def get_group_key(error):
+        if error.code:
+            return error.severity, error.code, error.field
+        return error.severity, None, error.detail
+
+    def append(self, error):
+        if error in self.seen:
+            return
+        self.seen.add(error)
+        key = self.get_group_key(error)
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [error, 1]
+        else:
+            group[1] += 1
+
+    def extend(self, errors):
+        for error in errors:
+            self.append(error)
+
+    def __iter__(self):
+        """
+        Yield tuples of (first Error, occurrences count) for each group.
+        """
+        for error, count in self.groups.values():
+            yield error, count
+
+    def __len__(self):
+        return len(self.groups)
+
+    def count(self, minimum_severity=NOTSET):
+        """
+        Return the number of errors with a severity of at least
+        `minimum_severity`.
+        """
+        return sum(count for error, count in self
+                   if error.severity >= minimum_severity)
+
+
 """
 Return True if a string s  name is safe to use as an attribute name.
 """
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2014-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import unittest
+
+from testing_utils import get_temp_dir
+
+from attributecode import model
+from attributecode.cache import AboutCache
+from attributecode.cache import ChecksumCache
+
+
+def create_file(location, text):
+    with io.open(location, 'w', encoding='utf-8') as out:
+        out.write(text)
+
+
+class AboutCacheTest(unittest.TestCase):
+
+    def create_about_tree(self):
+        test_dir = get_temp_dir()
+        about_loc = os.path.join(test_dir, 'test.ABOUT')
+        create_file(about_loc,
+            'about_resource: .\n'
+            'name: test\n'
+            'license_file: test.LICENSE\n'
+        )
+        create_file(os.path.join(test_dir, 'test.LICENSE'), 'some license')
+        return test_dir, about_loc
+
+    def test_cache_get_returns_none_when_not_cached(self):
+        _test_dir, about_loc = self.create_about_tree()
+        cache = AboutCache(get_temp_dir())
+        assert None == cache.get(about_loc, 'test.ABOUT')
+
+    def test_cache_get_returns_cached_about(self):
+        _test_dir, about_loc = self.create_about_tree()
+        cache = AboutCache(get_temp_dir())
+        about = model.About(about_loc, 'test.ABOUT')
+        cache.put(about)
+        cached = cache.get(about_loc, 'test.ABOUT')
+        assert about == cached
+        assert about.errors == cached.errors
+        expected = {'test.LICENSE': 'some license'}
+        assert expected == dict(cached.license_file.value)
+
+    def test_cache_get_is_invalidated_when_a_referenced_file_changes(self):
+        test_dir, about_loc = self.create_about_tree()
+        cache = AboutCache(get_temp_dir())
+        cache.put(model.About(about_loc, 'test.ABOUT'))
+        create_file(os.path.join(test_dir, 'test.LICENSE'), 'a new license text')
+        assert None == cache.get(about_loc, 'test.ABOUT')
+
+    def test_cache_get_is_invalidated_when_a_missing_file_is_created(self):
+        test_dir, about_loc = self.create_about_tree()
+        os.remove(os.path.join(test_dir, 'test.LICENSE'))
+        cache = AboutCache(get_temp_dir())
+        cache.put(model.About(about_loc, 'test.ABOUT'))
+        assert None != cache.get(about_loc, 'test.ABOUT')
+        create_file(os.path.join(test_dir, 'test.LICENSE'), 'some license')
+        assert None == cache.get(about_loc, 'test.ABOUT')
+
+    def test_collect_inventory_with_cache_dir_is_the_same_as_without(self):
+        test_dir, _about_loc = self.create_about_tree()
+        cache_dir = get_temp_dir()
+        errors, abouts = model.collect_inventory(test_dir)
+        for _ in range(2):
+            cached_errors, cached_abouts = model.collect_inventory(
+                test_dir, cache_dir=cache_dir)
+            assert errors == cached_errors
+            assert abouts == cached_abouts
+
+
+class ChecksumCacheTest(unittest.TestCase):
+
+    def test_checksum_cache_computes_once_and_persists(self):
+        location = os.path.join(get_temp_dir(), 'test.txt')
+        create_file(location, 'some text')
+        cache_dir = get_temp_dir()
+        computed = []
+
+        def compute(loc):
+            computed.append(loc)
+            return {'md5': 'some'}
+
+        assert {'md5': 'some'} == ChecksumCache(cache_dir).get_or_compute(location, compute)
+        cache = ChecksumCache(cache_dir)
+        assert {'md5': 'some'} == cache.get_or_compute(location, compute)
+        assert [location] == computed
+
+    def test_checksum_cache_is_invalidated_when_the_file_changes(self):
+        location = os.path.join(get_temp_dir(), 'test.txt')
+        create_file(location, 'some text')
+        cache = ChecksumCache()
+        assert 1 == cache.get_or_compute(location, lambda loc: 1)
+        create_file(location, 'some other text')
+        assert 2 == cache.get_or_compute(location, lambda loc: 2)
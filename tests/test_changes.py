@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2014-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import unittest
+
+import mock
+
+from testing_utils import get_temp_dir
+
+from attributecode import CRITICAL
+from attributecode import changes
+from attributecode import model
+from attributecode.changes import GitError
+from attributecode.changes import get_changed_locations
+from attributecode.changes import get_referenced_locations
+from attributecode.changes import run_git
+from attributecode.changes import select_changed_about_locations
+from attributecode.util import to_posix
+
+
+def create_file(location, text):
+    parent = os.path.dirname(location)
+    if not os.path.exists(parent):
+        os.makedirs(parent)
+    with io.open(location, 'w', encoding='utf-8') as out:
+        out.write(text)
+
+
+def has_git():
+    try:
+        run_git(os.getcwd(), '--version')
+        return True
+    except GitError:
+        return False
+
+
+class ChangesTest(unittest.TestCase):
+
+    def create_about_tree(self):
+        test_dir = to_posix(get_temp_dir())
+        create_file(test_dir + '/a/x.txt', 'x')
+        create_file(test_dir + '/a/x.ABOUT', 'about_resource: x.txt\nname: x\n')
+        create_file(test_dir + '/b/y.txt', 'y')
+        create_file(test_dir + '/b/l.LICENSE', 'license')
+        create_file(test_dir + '/b/b.ABOUT',
+            'about_resource: .\n'
+            'name: b\n'
+            'licenses:\n'
+            '    -   key: l\n'
+            '        file: l.LICENSE\n'
+        )
+        return test_dir
+
+    def test_get_referenced_locations(self):
+        test_dir = self.create_about_tree()
+        expected = [test_dir + '/b', test_dir + '/b/l.LICENSE']
+        assert expected == get_referenced_locations(test_dir + '/b/b.ABOUT')
+
+    def test_select_changed_about_locations(self):
+        test_dir = self.create_about_tree()
+        about_locations = [test_dir + '/a/x.ABOUT', test_dir + '/b/b.ABOUT']
+        assert [] == select_changed_about_locations(about_locations, set())
+
+        changed = set([test_dir + '/a/x.ABOUT'])
+        expected = [test_dir + '/a/x.ABOUT']
+        assert expected == select_changed_about_locations(about_locations, changed)
+
+        # a changed resource or license file or a file in a resource directory
+        for changed_file in ('/a/x.txt', '/b/l.LICENSE', '/b/y.txt', '/b/c/new.txt'):
+            changed = set([test_dir + changed_file])
+            selected = select_changed_about_locations(about_locations, changed)
+            assert 1 == len(selected)
+
+    def test_select_changed_about_locations_only_parses_possible_referrers(self):
+        test_dir = self.create_about_tree()
+        create_file(test_dir + '/c/z.txt', 'z')
+        create_file(test_dir + '/c/z.ABOUT',
+            'about_resource: z.txt\nname: z\nlicense_file: ../b/l.LICENSE\n')
+        create_file(test_dir + '/d/w.txt', 'w')
+        create_file(test_dir + '/d/w.txt.ABOUT', 'about_resource: w.txt\nname: w\n')
+        about_locations = [
+            test_dir + '/a/x.ABOUT', test_dir + '/b/b.ABOUT',
+            test_dir + '/c/z.ABOUT', test_dir + '/d/w.txt.ABOUT']
+
+        with mock.patch.object(changes, 'get_referenced_locations',
+                               wraps=changes.get_referenced_locations) as parse:
+            changed = set([test_dir + '/a/x.txt'])
+            selected = select_changed_about_locations(about_locations, changed)
+            assert [test_dir + '/a/x.ABOUT'] == selected
+            # b.ABOUT and w.txt.ABOUT cannot reference a file in a/
+            expected = [mock.call(test_dir + '/a/x.ABOUT'), mock.call(test_dir + '/c/z.ABOUT')]
+            assert expected == parse.call_args_list
+
+            # the w.txt.ABOUT file of w.txt is selected without parsing
+            parse.reset_mock()
+            changed = set([test_dir + '/d/w.txt'])
+            selected = select_changed_about_locations(about_locations, changed)
+            assert [test_dir + '/d/w.txt.ABOUT'] == selected
+            assert [mock.call(test_dir + '/c/z.ABOUT')] == parse.call_args_list
+
+            parse.reset_mock()
+            changed = set([test_dir + '/b/l.LICENSE'])
+            selected = select_changed_about_locations(about_locations, changed)
+            assert [test_dir + '/b/b.ABOUT', test_dir + '/c/z.ABOUT'] == selected
+
+    def test_select_changed_about_locations_with_jobs(self):
+        test_dir = self.create_about_tree()
+        about_locations = [test_dir + '/a/x.ABOUT', test_dir + '/b/b.ABOUT']
+        for changed_file in ('/b/l.LICENSE', '/b/y.txt'):
+            changed = set([test_dir + changed_file, test_dir + '/a/new.txt'])
+            # both ABOUT files are parsed as their directory has a change
+            selected = select_changed_about_locations(about_locations, changed, jobs=2)
+            assert [test_dir + '/b/b.ABOUT'] == selected
+
+    def test_get_changed_locations_rejects_refs_that_look_like_options(self):
+        test_dir = self.create_about_tree()
+        output = test_dir + '/diff.txt'
+        try:
+            get_changed_locations(test_dir, '--output=' + output)
+            self.fail('GitError not raised')
+        except GitError as e:
+            assert 'Invalid git revision' in str(e)
+        assert not os.path.exists(output)
+
+    @unittest.skipIf(not has_git(), 'git is not available')
+    def test_collect_inventory_with_changed_since(self):
+        test_dir = self.create_about_tree()
+        git_args = ('-c', 'user.name=test', '-c', 'user.email=test@example.com')
+        run_git(test_dir, 'init', '-q')
+        run_git(test_dir, 'add', '-A')
+        run_git(test_dir, *(git_args + ('commit', '-q', '-m', 'initial')))
+
+        errors, abouts = model.collect_inventory(test_dir, changed_since='HEAD')
+        assert [] == errors
+        assert [] == abouts
+
+        create_file(test_dir + '/a/x.txt', 'changed')
+        errors, abouts = model.collect_inventory(test_dir, changed_since='HEAD')
+        assert [] == errors
+        assert ['a/x.ABOUT'] == [a.about_file_path for a in abouts]
+
+    @unittest.skipIf(not has_git(), 'git is not available')
+    def test_collect_inventory_with_changed_since_selects_renamed_resources(self):
+        test_dir = self.create_about_tree()
+        git_args = ('-c', 'user.name=test', '-c', 'user.email=test@example.com')
+        run_git(test_dir, 'init', '-q')
+        run_git(test_dir, 'add', '-A')
+        run_git(test_dir, *(git_args + ('commit', '-q', '-m', 'initial')))
+        run_git(test_dir, 'mv', 'a/x.txt', 'a/x2.txt')
+
+        changed = get_changed_locations(test_dir, 'HEAD')
+        assert test_dir + '/a/x.txt' in changed
+        assert test_dir + '/a/x2.txt' in changed
+
+        # the ABOUT file of the renamed file is stale and is selected
+        errors, abouts = model.collect_inventory(test_dir, changed_since='HEAD')
+        assert ['a/x.ABOUT'] == [a.about_file_path for a in abouts]
+        assert errors
+
+    @unittest.skipIf(not has_git(), 'git is not available')
+    def test_collect_inventory_with_changed_since_checks_all_on_git_errors(self):
+        test_dir = self.create_about_tree()
+        run_git(test_dir, 'init', '-q')
+        errors, abouts = model.collect_inventory(test_dir, changed_since='HEAD')
+        assert 2 == len(abouts)
+        assert ['git-error'] == [e.code for e in errors]
+        assert CRITICAL == errors[0].severity
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2014-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import os
+import unittest
+
+from testing_utils import get_temp_dir
+
+from attributecode import WARNING
+from attributecode import model
+from attributecode.cache import ChecksumCache
+from attributecode.checksum import multi_checksums
+from attributecode.checksum import verify_checksums
+
+
+def create_file(location, text):
+    with io.open(location, 'w', encoding='utf-8') as out:
+        out.write(text)
+
+
+class ChecksumTest(unittest.TestCase):
+
+    def create_about_tree(self, checksums):
+        test_dir = get_temp_dir()
+        create_file(os.path.join(test_dir, 'test.txt'), 'hello')
+        about_loc = os.path.join(test_dir, 'test.txt.ABOUT')
+        create_file(about_loc,
+            'about_resource: test.txt\n'
+            'name: test\n' + checksums
+        )
+        return test_dir
+
+    def test_multi_checksums_in_small_chunks(self):
+        location = os.path.join(get_temp_dir(), 'test.txt')
+        content = b'hello' * 1000
+        with open(location, 'wb') as out:
+            out.write(content)
+        expected = {
+            'md5': hashlib.md5(content).hexdigest(),
+            'sha1': hashlib.sha1(content).hexdigest(),
+            'sha256': hashlib.sha256(content).hexdigest(),
+        }
+        assert expected == multi_checksums(location, chunk_size=7)
+        assert expected == multi_checksums(location)
+
+    def test_verify_checksums_reports_mismatches_only(self):
+        test_dir = self.create_about_tree(
+            'checksum_md5: 5D41402ABC4B2A76B9719D911017C592\n'
+            'checksum_sha1: 0000\n')
+        _errors, abouts = model.collect_inventory(test_dir)
+        for workers in (1, 4):
+            results = list(verify_checksums(abouts, workers=workers))
+            assert 1 == len(results)
+            errors = results[0]
+            assert 1 == len(errors)
+            error = errors[0]
+            assert 'checksum-mismatch' == error.code
+            assert 'checksum_sha1' == error.field
+            assert 'test.txt.ABOUT' == error.path
+
+    def test_verify_checksums_ignores_abouts_without_checksums(self):
+        test_dir = self.create_about_tree('')
+        _errors, abouts = model.collect_inventory(test_dir)
+        assert [] == list(verify_checksums(abouts, cache=ChecksumCache()))
+
+    def test_verify_checksums_warns_about_checksums_that_are_not_verified(self):
+        test_dir = self.create_about_tree('checksum_sha1: 0000\n')
+        os.remove(os.path.join(test_dir, 'test.txt'))
+        _errors, abouts = model.collect_inventory(test_dir)
+        results = list(verify_checksums(abouts))
+        assert 1 == len(results)
+        errors = results[0]
+        assert ['checksum-not-verified'] == [e.code for e in errors]
+        assert WARNING == errors[0].severity
+        assert 'about_resource test.txt not found' in errors[0].message
+
+    def test_verify_checksums_consumes_abouts_in_a_bounded_window(self):
+        test_dir = self.create_about_tree(
+            'checksum_md5: 5D41402ABC4B2A76B9719D911017C592\n')
+        _errors, abouts = model.collect_inventory(test_dir)
+        consumed = []
+
+        def iter_abouts():
+            for _ in range(50):
+                consumed.append(abouts[0])
+                yield abouts[0]
+
+        results = verify_checksums(iter_abouts(), workers=2)
+        assert [] == next(results)
+        assert len(consumed) < 50
+        assert 49 == len(list(results))
@@ -29,6 +29,7 @@ from attributecode import NOTSET
 from attributecode import WARNING
 from attributecode import cmd
 from attributecode import Error
+from attributecode.util import ErrorSummary
 
 from testing_utils import run_about_command_test_click
 from testing_utils import get_test_loc
@@ -62,6 +63,26 @@ def test_report_errors(capsys):
     assert expected_out == out.splitlines(False)
 
 
+def test_report_errors_summary_counts_are_the_same_as_the_text_counts(capsys):
+    errors = cmd.get_errors_collector('summary')
+    errors.extend([
+        Error(CRITICAL, 'a.ABOUT: msg1', path='a.ABOUT'),
+        Error(CRITICAL, 'a.ABOUT: msg1', path='a.ABOUT'),
+        Error(CRITICAL, 'b.ABOUT: msg1', path='b.ABOUT'),
+        Error(WARNING, 'msg2'),
+        Error(WARNING, 'msg2'),
+    ])
+    ec = cmd.report_errors(errors, quiet=False, verbose=True, errors_format='summary')
+    assert 3 == ec
+    out, _err = capsys.readouterr()
+    expected_out = [
+        'Command completed with 3 errors or warnings.',
+        'CRITICAL: msg1: 2 occurrences',
+        'WARNING: msg2',
+    ]
+    assert expected_out == out.splitlines(False)
+
+
 def test_report_errors_without_verbose(capsys):
     errors = [
         Error(CRITICAL, 'msg1'),
@@ -171,6 +192,74 @@ def test_report_errors_can_write_to_logfile():
     assert expected == result.splitlines(False)
 
 
+def test_report_errors_summarizes_suppressed_errors_in_logfile():
+    errors = [
+        Error(CRITICAL, 'msg1'),
+    ]
+    result_file = get_temp_file()
+    _ec = cmd.report_errors(errors, quiet=True, verbose=False,
+                            log_file_loc=result_file,
+                            suppressed_errors={INFO: 12, DEBUG: 0})
+    with io.open(result_file, 'r', encoding='utf-8') as rf:
+        result = rf.read()
+    expected = [
+        'Command completed with 1 errors or warnings.',
+        'CRITICAL: msg1',
+        'INFO: 12 messages not reported. Use --verbose to report them.',
+    ]
+    assert expected == result.splitlines(False)
+
+
+def test_get_summary_messages():
+    errors = [
+        Error(INFO, 'a.ABOUT: Field x is a custom field.',
+              code='custom-field', path='a.ABOUT', field='x'),
+        Error(INFO, 'b.ABOUT: Field x is a custom field.',
+              code='custom-field', path='b.ABOUT', field='x'),
+        Error(CRITICAL, 'a.ABOUT: msg1', path='a.ABOUT'),
+        Error(CRITICAL, 'b.ABOUT: msg1', path='b.ABOUT'),
+        Error(WARNING, 'msg2'),
+    ]
+    summary = ErrorSummary(errors)
+    emsgs, ec = cmd.get_summary_messages(summary, verbose=True)
+    assert 3 == ec
+    expected = [
+        'Command completed with 3 errors or warnings.',
+        'INFO: custom-field x: 2 occurrences, such as: a.ABOUT: Field x is a custom field.',
+        'CRITICAL: msg1: 2 occurrences',
+        'WARNING: msg2',
+    ]
+    assert expected == emsgs
+
+    emsgs, ec = cmd.get_summary_messages(summary)
+    assert 3 == ec
+    assert expected[:1] + expected[2:] == emsgs
+
+
+def test_report_errors_with_jsonl_format(capsys):
+    errors = [
+        Error(CRITICAL, 'a.ABOUT: msg1', code='required-field', path='a.ABOUT',
+              field='name'),
+        Error(INFO, 'msg2'),
+    ]
+    result_file = get_temp_file()
+    ec = cmd.report_errors(errors, quiet=False, verbose=False,
+                           log_file_loc=result_file, errors_format='jsonl')
+    assert 1 == ec
+    out, _err = capsys.readouterr()
+    expected = [
+        '{"severity": "CRITICAL", "code": "required-field", "path": "a.ABOUT", '
+        '"field": "name", "message": "msg1"}',
+    ]
+    assert expected == out.splitlines(False)
+    with io.open(result_file, 'r', encoding='utf-8') as rf:
+        result = rf.read()
+    expected.append(
+        '{"severity": "INFO", "code": null, "path": null, "field": null, '
+        '"message": "msg2"}')
+    assert expected == result.splitlines(False)
+
+
 def test_report_errors_does_not_report_duplicate_errors(capsys):
     errors = [
         Error(CRITICAL, 'msg1'),
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+# ============================================================================
+#  Copyright (c) 2014-2019 nexB Inc. http://www.nexb.com/ - All rights reserved.
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#      http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+# ============================================================================
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import sqlite3
+import unittest
+
+from testing_utils import get_temp_dir
+from testing_utils import get_temp_file
+from testing_utils import get_test_loc
+
+from attributecode import CRITICAL
+from attributecode import Error
+from attributecode import WARNING
+from attributecode import attrib
+from attributecode import database
+from attributecode import gen
+from attributecode import model
+from attributecode import util
+
+
+def save_inventory(test_dir):
+    errors, abouts = model.collect_inventory(test_dir)
+    location = get_temp_file('inventory.sqlite')
+    assert [] == model.write_output(abouts, location, format='sqlite')
+    return abouts, location
+
+
+def get_files(base_dir):
+    """
+    Return a sorted list of (relative path, text) for the files in `base_dir`.
+    """
+    files = []
+    for top, _dirs, names in os.walk(base_dir):
+        for name in names:
+            location = os.path.join(top, name)
+            with io.open(location, encoding='utf-8') as text_file:
+                files.append((os.path.relpath(location, base_dir), text_file.read()))
+    return sorted(files)
+
+
+class DatabaseTest(unittest.TestCase):
+
+    def test_is_sqlite_file(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        _abouts, location = save_inventory(test_dir)
+        assert database.is_sqlite_file(location)
+        assert not database.is_sqlite_file(get_test_loc('test_gen/inv.csv'))
+        assert not database.is_sqlite_file(os.path.join(get_temp_dir(), 'missing'))
+
+    def test_save_abouts_as_sqlite_and_load_abouts(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        _abouts, location = save_inventory(test_dir)
+        errors, loaded = database.load_abouts(location)
+        _errors, abouts = model.collect_inventory(test_dir)
+
+        assert [] == [e for e in errors if e.severity >= WARNING]
+        assert [a.about_file_path for a in abouts] == [a.about_file_path for a in loaded]
+        for about, loaded_about in zip(abouts, loaded):
+            assert about.as_dict() == loaded_about.as_dict()
+
+    def test_save_abouts_as_sqlite_stores_licenses_rows(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        _abouts, location = save_inventory(test_dir)
+        conn = sqlite3.connect(location)
+        try:
+            result = list(conn.execute(
+                'SELECT c.about_file_path, l.key, l.file FROM licenses l '
+                'JOIN components c ON c.id = l.component_id '
+                'WHERE c.about_file_path = ?', ('about/about.ABOUT',)))
+        finally:
+            conn.close()
+        assert [('about/about.ABOUT', None, 'apache-2.0.LICENSE')] == result
+
+    def test_save_abouts_as_sqlite_replaces_an_existing_file(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        _abouts, location = save_inventory(test_dir)
+        errors, abouts = model.collect_inventory(get_test_loc('test_model/this.ABOUT'))
+        assert [] == database.save_abouts_as_sqlite(location, abouts)
+        errors, loaded = database.load_abouts(location)
+        assert ['test_model/this.ABOUT'] == [a.about_file_path for a in loaded]
+
+    def test_save_abouts_as_sqlite_reports_an_error_for_a_directory(self):
+        location = get_temp_dir()
+        errors = database.save_abouts_as_sqlite(os.path.join(location, 'a', 'b'), [])
+        assert 1 == len(errors)
+        assert CRITICAL == errors[0].severity
+        assert 'output-error' == errors[0].code
+
+    def test_save_errors_to_sqlite(self):
+        _abouts, location = save_inventory(get_test_loc('test_model/this.ABOUT'))
+        summary = util.ErrorSummary()
+        summary.extend([
+            Error(WARNING, 'a.ABOUT: Field foo is a custom field.',
+                  code='custom-field', path='a.ABOUT', field='foo'),
+            Error(WARNING, 'b.ABOUT: Field foo is a custom field.',
+                  code='custom-field', path='b.ABOUT', field='foo'),
+            Error(CRITICAL, 'Cannot load.'),
+        ])
+        database.save_errors_to_sqlite(location, summary)
+        conn = sqlite3.connect(location)
+        try:
+            result = list(conn.execute(
+                'SELECT severity, code, field, count FROM errors ORDER BY severity'))
+        finally:
+            conn.close()
+        expected = [
+            (WARNING, 'custom-field', 'foo', 2),
+            (CRITICAL, None, None, 1),
+        ]
+        assert expected == result
+
+    def test_load_inventory_items_has_the_original_values(self):
+        _abouts, location = save_inventory(get_test_loc('test_model/this.ABOUT'))
+        items = database.load_inventory_items(location)
+        assert 1 == len(items)
+        item = items[0]
+        # like in a CSV inventory, the about_resource is from the inventory root
+        assert 'about_resource' == list(item.keys())[0]
+        assert '/test_model/' == item['about_resource']
+        assert 'about_file_path' not in item
+        assert 'AboutCode' == item['name']
+
+    def test_gen_from_sqlite_with_directory_about_resources(self):
+        test_dir = get_temp_dir()
+        for name in ('foo', 'bar'):
+            os.mkdir(os.path.join(test_dir, name))
+            about_location = os.path.join(test_dir, name, name + '.ABOUT')
+            with io.open(about_location, 'w', encoding='utf-8') as about_file:
+                about_file.write(
+                    'about_resource: .\n'
+                    'name: %(name)s\n'
+                    'license_expression: mit\n'
+                    'licenses:\n'
+                    '  - key: mit\n'
+                    '    file: mit.LICENSE\n' % locals())
+        _abouts, location = save_inventory(test_dir)
+        csv_location = get_temp_file('inventory.csv')
+        _errors, abouts = model.collect_inventory(test_dir)
+        assert [] == model.write_output(abouts, csv_location, format='csv')
+
+        base_dir = get_temp_dir()
+        errors, generated = gen.generate(location, base_dir)
+        expected_base_dir = get_temp_dir()
+        expected_errors, expected = gen.generate(csv_location, expected_base_dir)
+
+        # the license files are reported as missing in both cases
+        expected_errors = [e.message.replace(expected_base_dir, base_dir) for e in expected_errors]
+        assert expected_errors == [e.message for e in errors]
+        assert ['bar/', 'foo/'] == sorted(a.about_file_path for a in generated)
+        assert [a.dumps() for a in expected] == [a.dumps() for a in generated]
+        for name in ('foo', 'bar'):
+            with io.open(os.path.join(base_dir, name, name + '.ABOUT'), encoding='utf-8') as generated_file:
+                result = generated_file.read()
+            with io.open(os.path.join(expected_base_dir, name, name + '.ABOUT'), encoding='utf-8') as expected_file:
+                assert expected_file.read() == result
+
+    def test_gen_from_sqlite_is_the_same_as_from_csv(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        abouts, location = save_inventory(test_dir)
+        csv_location = get_temp_file('inventory.csv')
+        assert [] == model.write_output(abouts, csv_location, format='csv')
+
+        base_dir = get_temp_dir()
+        _errors, generated = gen.generate(location, base_dir)
+        expected_base_dir = get_temp_dir()
+        _errors, expected = gen.generate(csv_location, expected_base_dir)
+        # the ABOUT file names follow from the about_resource and not from the
+        # original ABOUT file names such as about/Jinja2.ABOUT
+        expected_paths = [a.about_file_path for a in expected]
+        assert 'about/Jinja2-2.7.3-py2-none-any.whl' in expected_paths
+        assert expected_paths == [a.about_file_path for a in generated]
+        assert [a.dumps() for a in expected] == [a.dumps() for a in generated]
+        assert get_files(expected_base_dir) == get_files(base_dir)
+
+    def test_attrib_from_sqlite_is_the_same_as_from_the_abouts(self):
+        test_dir = get_test_loc('test_model/inventory/complex')
+        _abouts, location = save_inventory(test_dir)
+        _errors, loaded = database.load_abouts(location)
+        _errors, abouts = model.collect_inventory(test_dir)
+
+        _error, expected = attrib.generate_from_file(abouts)
+        _error, result = attrib.generate_from_file(loaded)
+        # strip the timestamp: the timestamp is wrapped in italic block
+        expected = [line for line in expected.splitlines() if '<i>' not in line]
+        result = [line for line in result.splitlines() if '<i>' not in line]
+        assert expected == result
@@ -19,9 +19,11 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
+import os
 import unittest
 
 from testing_utils import get_temp_dir
+from testing_utils import get_temp_file
 from testing_utils import get_test_loc
 
 from attributecode import ERROR
@@ -29,23 +31,29 @@ from attributecode import INFO
 from attributecode import CRITICAL
 from attributecode import Error
 from attributecode import gen
+from attributecode import util
 from unittest.case import skip
 
 
 class GenTest(unittest.TestCase):
+    def get_csv_columns(self, location):
+        rows = util.CsvRows(location)
+        list(rows)
+        return rows.columns
+
     def test_check_duplicated_columns(self):
         test_file = get_test_loc('test_gen/dup_keys.csv')
         expected = [Error(ERROR, 'Duplicated column name(s): copyright with copyright\nPlease correct the input and re-run.')]
-        result = gen.check_duplicated_columns(test_file)
+        result = gen.check_duplicated_columns(self.get_csv_columns(test_file))
         assert expected == result
 
     def test_check_duplicated_columns_handles_lower_upper_case(self):
         test_file = get_test_loc('test_gen/dup_keys_with_diff_case.csv')
         expected = [Error(ERROR, 'Duplicated column name(s): copyright with Copyright\nPlease correct the input and re-run.')]
-        result = gen.check_duplicated_columns(test_file)
+        result = gen.check_duplicated_columns(self.get_csv_columns(test_file))
         assert expected == result
 
-    def test_check_duplicated_about_resource(self):
+    def test_check_inventory_duplicated_about_resource(self):
         test_dict = [
             {'about_resource': '/test/test.c', 'version': '1.03', 'name': 'test.c'},
             {'about_resource': '/test/abc/', 'version': '1.0', 'name': 'abc'},
@@ -53,21 +61,78 @@ class GenTest(unittest.TestCase):
         expected = [
             Error(CRITICAL,
                   "The input has duplicated values in 'about_resource' field: /test/test.c")]
-        result = gen.check_duplicated_about_resource(test_dict)
+        result = gen.check_inventory(test_dict)
         assert expected == result
 
-    def test_check_newline_in_file_field(self):
+    def test_check_inventory_newline_in_file_field(self):
         test_dict = [
             {'about_resource': '/test/test.c', 'name': 'test.c', 'notice_file': 'NOTICE\nNOTICE2'},
-            {'about_resource': '/test/abc/', 'version': '1.0', 'name': 'abc'},
-            {'about_resource': '/test/test.c', 'version': '1.04', 'name': 'test1.c'}]
+            {'about_resource': '/test/abc/', 'version': '1.0', 'name': 'abc'}]
         expected = [
             Error(CRITICAL,
                   "New line character detected in 'notice_file' for '/test/test.c' which is not supported."
                   "\nPlease use ',' to declare multiple files.")]
-        result = gen.check_newline_in_file_field(test_dict)
+        result = gen.check_inventory(test_dict)
         assert expected == result
 
+    def test_check_inventory_reports_all_the_problems(self):
+        test_dict = [
+            {'about_resource': '/test/test.c', 'name': 'test.c', 'notice_file': 'NOTICE\nNOTICE2'},
+            {'about_resource': '/test/abc/', 'version': '1.0'},
+            {'about_resource': '/test/test.c', 'version': '1.04', 'name': 'test1.c'},
+            {'version': '1.05', 'name': 'test2.c', 'author_file': ['AUTHORS']}]
+        columns = ['about_resource', 'name', 'Name', 'version', 'notice_file']
+        expected = [
+            Error(ERROR, 'Duplicated column name(s): name with Name\nPlease correct the input and re-run.'),
+            Error(CRITICAL,
+                  "New line character detected in 'notice_file' for '/test/test.c' which is not supported."
+                  "\nPlease use ',' to declare multiple files."),
+            Error(CRITICAL,
+                  "The input has duplicated values in 'about_resource' field: /test/test.c"),
+            Error(ERROR, "Required field: 'name' not found in the <input>"),
+            Error(ERROR, "Required field: 'about_resource' not found in the <input>"),
+        ]
+        result = gen.check_inventory(test_dict, columns)
+        assert expected == result
+
+    def test_check_inventory_is_single_pass(self):
+        test_rows = iter([
+            {'about_resource': '/test/test.c', 'name': 'test.c'},
+            {'about_resource': '/test/test.c', 'name': 'test1.c'}])
+        result = gen.check_inventory(test_rows)
+        assert 1 == len(result)
+
+    def test_load_inventory_reports_all_the_problems(self):
+        location = get_temp_file('inv.csv')
+        with open(location, 'w') as inv:
+            inv.write('about_resource,Version,version\n'
+                      'test.c,1.0,1.0\n'
+                      'test.c,1.1,1.1\n')
+        errors, abouts = gen.load_inventory(location, get_temp_dir())
+        assert [] == abouts
+        expected = [
+            Error(ERROR, 'Duplicated column name(s): version with version\nPlease correct the input and re-run.'),
+            Error(CRITICAL,
+                  "The input has duplicated values in 'about_resource' field: test.c"),
+            Error(ERROR, "Required field: 'name' not found in the <input>"),
+        ]
+        assert expected == errors
+
+    def test_load_inventory_does_not_load_invalid_text_or_long_rows(self):
+        location = get_temp_file('inv.csv')
+        with open(location, 'wb') as inv:
+            inv.write(b'about_resource,name\n'
+                      b'test.c,caf\xe9\n'
+                      b'test.h,test.h,extra\n')
+        errors, abouts = gen.load_inventory(location, get_temp_dir())
+        assert [] == abouts
+        expected = [
+            Error(CRITICAL, 'Line 2 of %s is not valid UTF-8 text.' % location),
+            Error(CRITICAL, 'Line 3 of %s has 3 values but there are only '
+                            '2 columns: the extra values are ignored.' % location),
+        ]
+        assert expected == errors
+
     def test_load_inventory(self):
         location = get_test_loc('test_gen/inv.csv')
         base_dir = get_temp_dir()
@@ -137,6 +202,25 @@ custom1: |
         assert expected_errors_msg1 in errors[0].message or expected_errors_msg1 in errors[1].message
         assert expected_errors_msg2 in errors[0].message or expected_errors_msg2 in errors[1].message
 
+    def test_iter_generate_writes_each_about_file_as_its_row_is_read(self):
+        location = get_test_loc('test_gen/inv4.csv')
+        base_dir = get_temp_dir()
+        generated = []
+        for about, _errors in gen.iter_generate(location, base_dir):
+            assert about is not None
+            dump_loc = os.path.join(base_dir, about.about_file_path.lstrip('/'))
+            assert os.path.exists(dump_loc)
+            generated.append(about.about_file_path)
+        assert ['inv/'] == generated
+
+    def test_iter_load_inventory_yields_the_inventory_errors_first(self):
+        location = get_test_loc('test_gen/dup_keys.csv')
+        result = list(gen.iter_load_inventory(location, get_temp_dir()))
+        assert 1 == len(result)
+        about, errors = result[0]
+        assert None == about
+        assert 'Duplicated column name(s)' in errors[0].message
+
     def test_generation_with_no_about_resource(self):
         location = get_test_loc('test_gen/inv2.csv')
         base_dir = get_temp_dir()
@@ -21,6 +21,7 @@ from __future__ import unicode_literals
 from collections import OrderedDict
 import io
 import json
+import os
 import posixpath
 import shutil
 import unittest
@@ -34,12 +35,14 @@ from attributecode import INFO
 from attributecode import WARNING
 from attributecode import Error
 from attributecode import model
+from attributecode import util
 from attributecode.util import add_unc
 from attributecode.util import load_csv
 from attributecode.util import to_posix
 from attributecode.util import replace_tab_with_spaces
 
 from testing_utils import extract_test_loc
+from testing_utils import get_temp_dir
 from testing_utils import get_temp_file
 from testing_utils import get_test_loc
 
@@ -174,6 +177,18 @@ class FieldTest(unittest.TestCase):
         assert model.UrlField.is_valid_url('http://de.wikipedia.org/wiki/Elf (Begriffsklärung)')
         assert model.UrlField.is_valid_url('http://nothing_here.com')
 
+    def test_UrlField_and_UrlListField_share_cached_normalized_urls(self):
+        cache = model.url_validation_cache
+        url = 'https://Cached.Example.com/Some/Path'
+        assert model.UrlField.is_valid_url(url)
+        assert 'https://cached.example.com/Some/Path' == cache.items[url]
+        assert model.UrlListField.is_valid_url(' %s ' % url)
+        assert [url] == [key for key in cache.items if 'Cached' in key]
+
+    def test_get_normalized_url(self):
+        assert 'http://www.example.com/A' == model.get_normalized_url(' HTTP://WWW.Example.com/A ')
+        assert None == model.get_normalized_url('www.example.com')
+
     def test_UrlField_is_valid_url_no_schemes(self):
         assert not model.UrlField.is_valid_url('google.com')
         assert not model.UrlField.is_valid_url('www.google.com')
@@ -378,9 +393,146 @@ test with no colon
             self.fail('Exception not raised')
         except Exception:
             pass
+    def test_Field_has_validator(self):
+        assert not model.StringField.has_validator()
+        assert not model.Field.has_validator()
+        assert model.SingleLineField.has_validator()
+        assert model.UrlField.has_validator()
+        assert model.AboutResourceField.has_validator()
+
+    def test_validate_fields_only_validates_present_or_required_fields(self):
+        absent = model.UrlField(name='homepage_url', value='not a url')
+        present = model.UrlField(name='owner_url', value='not a url', present=True)
+        required = model.StringField(name='name', required=True)
+        errors = model.validate_fields([absent, present, required], None, False, None)
+        expected = [
+            Error(WARNING, 'Field owner_url: Invalid URL: not a url'),
+            Error(CRITICAL, 'Field name is required'),
+        ]
+        assert expected == errors
+        assert '' == absent.value
+        assert [] == absent.errors
+
+    def test_Field_has_no_dict(self):
+        for field_class in (model.StringField, model.FileTextField, model.BooleanField):
+            field = field_class(name='f', value='x')
+            assert not hasattr(field, '__dict__')
+            try:
+                field.some_attribute = 1
+                self.fail('Field objects should not accept new attributes')
+            except AttributeError:
+                pass
+
 
 class AboutTest(unittest.TestCase):
 
+    def test_About_creates_only_required_and_present_fields(self):
+        test_file = get_test_loc('test_model/parse/ordered_fields.ABOUT')
+        a = model.About(test_file)
+        assert [] == a.errors
+        expected = ['about_resource', 'name', 'version', 'download_url']
+        assert expected == [f.name for f in a.fields.created_values()]
+
+        # absent fields are shared defaults
+        assert 'homepage_url' == a.fields['homepage_url'].name
+        assert a.fields.get('notes') is a.notes
+        assert [f.name for f in a.all_fields()] == list(a.fields.keys())
+
+    def test_About_absent_fields_are_created_on_access_and_not_shared(self):
+        a = model.About()
+        b = model.About()
+        a.license_key.value = ['mit']
+        a.license_key.present = True
+        assert a.license_key is not b.license_key
+        assert [] == b.license_key.value
+        assert not b.license_key.present
+        assert a.fields != b.fields
+
+    def test_About_license_file_texts_are_loaded_lazily_and_shared(self):
+        test_dir = get_temp_dir()
+        license_loc = os.path.join(test_dir, 'apache-2.0.LICENSE')
+        with io.open(license_loc, 'w', encoding='utf-8') as lic:
+            lic.write('some license text')
+        for name in ('a', 'b'):
+            with io.open(os.path.join(test_dir, name + '.ABOUT'), 'w', encoding='utf-8') as af:
+                af.write('about_resource: .\nname: %s\nlicense_file: apache-2.0.LICENSE\n' % name)
+
+        errors, abouts = model.collect_inventory(test_dir)
+        assert [] == errors
+        location = util.to_posix(license_loc)
+        assert location not in model.file_texts.texts
+
+        a, b = abouts
+        text = a.license_file.value['apache-2.0.LICENSE']
+        assert 'some license text' == text
+        assert text is b.license_file.value['apache-2.0.LICENSE']
+        expected = {'apache-2.0.LICENSE': 'some license text'}
+        assert expected == dict(b.license_file.value)
+
+    def test_About_license_file_that_is_not_a_file_reports_an_error(self):
+        test_dir = get_temp_dir()
+        os.mkdir(os.path.join(test_dir, 'dir.LICENSE'))
+        about_loc = os.path.join(test_dir, 'bad.ABOUT')
+        with io.open(about_loc, 'w', encoding='utf-8') as af:
+            af.write('about_resource: .\nname: bad\nlicense_file: dir.LICENSE\n')
+        a = model.About(about_loc, 'bad.ABOUT')
+        assert 1 == len(a.errors)
+        assert a.errors[0].message.startswith(
+            'Field license_file: Failed to load text at path: dir.LICENSE with error: Not a file:')
+
+    def test_TextStore_check_does_not_read_and_is_not_cached(self):
+        test_dir = get_temp_dir()
+        location = os.path.join(test_dir, 'bad.LICENSE')
+        store = model.TextStore()
+        assert store.check(location)
+        with io.open(location, 'wb') as lic:
+            lic.write(b'\xff\xfe\xfa invalid utf-8')
+        # the file is only checked with a stat call
+        assert None == store.check(location)
+        assert {} == store.texts
+        try:
+            store.get_text(location)
+            self.fail('UnicodeDecodeError not raised')
+        except UnicodeDecodeError:
+            pass
+
+    def test_TextStore_is_released_at_the_end_of_a_run(self):
+        from click.testing import CliRunner
+        from attributecode import cmd
+        test_dir = get_temp_dir()
+        with io.open(os.path.join(test_dir, 'apache-2.0.LICENSE'), 'w', encoding='utf-8') as lic:
+            lic.write('some license text')
+        with io.open(os.path.join(test_dir, 'a.ABOUT'), 'w', encoding='utf-8') as af:
+            af.write('about_resource: .\nname: a\nlicense_file: apache-2.0.LICENSE\n')
+        output = get_temp_file('attrib.html')
+        previous = model.file_texts
+        result = CliRunner().invoke(cmd.about, ['attrib', test_dir, output])
+        assert 0 == result.exit_code, result.output
+        with io.open(output, encoding='utf-8') as attrib:
+            assert 'some license text' in attrib.read()
+        assert model.file_texts is not previous
+        assert {} == model.file_texts.texts
+
+    def test_About_schema(self):
+        schema = model.About.schema
+        assert list(schema.names) == list(model.About().fields.keys())
+        assert set(['about_resource', 'name']) == schema.required
+        expected = set(['redistribute', 'attribute', 'track_changes',
+                        'modified', 'internal_use_only'])
+        assert expected == schema.boolean_fields
+        expected = set(['about_resource', 'license_file', 'notice_file',
+                        'changelog_file', 'author_file'])
+        assert expected == schema.file_fields
+        assert model.UrlField == schema.field_classes['homepage_url']
+
+    def test_About_unknown_attribute_raises_attribute_error(self):
+        a = model.About()
+        try:
+            a.not_a_field
+            self.fail('AttributeError not raised')
+        except AttributeError:
+            pass
+
     def test_About_load_ignores_original_field_order_and_uses_standard_predefined_order(self):
         # fields in this file are not in the standard order
         test_file = get_test_loc('test_model/parse/ordered_fields.ABOUT')
@@ -676,6 +828,32 @@ this software and releases the component to Public Domain.
         result = model.get_field_names(abouts)
         assert expected == result
 
+    def test_FieldNames_accumulates_names_as_abouts_are_added(self):
+        field_names = model.FieldNames()
+        assert [] == field_names.names
+
+        a = model.About()
+        a.custom_fields['zz'] = model.StringField(name='zz', value='1', present=True)
+        field_names.add(a)
+        assert ['about_resource', 'name', 'zz'] == field_names.names
+
+        b = model.About()
+        b.version.value = '1.0'
+        b.version.present = True
+        # created but absent fields are not collected
+        b.homepage_url
+        b.custom_fields['aa'] = model.StringField(name='aa', value='1', present=True)
+        b.custom_fields['empty'] = model.StringField(name='empty', present=True)
+        field_names.add(b)
+        assert ['about_resource', 'name', 'version', 'aa', 'zz'] == field_names.names
+
+    def test_FieldNames_names_are_the_same_until_a_new_name_is_added(self):
+        field_names = model.FieldNames()
+        field_names.add(model.About())
+        names = field_names.names
+        field_names.add(model.About())
+        assert names is field_names.names
+
 
 class SerializationTest(unittest.TestCase):
     def test_About_dumps(self):
@@ -1043,6 +1221,179 @@ class CollectorTest(unittest.TestCase):
         expected = [u'about_resource: .\nname: test\nresource: .\ncustom_mapping: test\n']
         assert expected == [a.dumps() for a in abouts]
 
+    def test_collect_inventory_with_min_severity_only_counts_lower_errors(self):
+        test_loc = get_test_loc('test_model/inventory/custom_fields2.ABOUT')
+        errors, abouts = model.collect_inventory(test_loc, min_severity=WARNING)
+        assert [] == errors
+        assert {INFO: 2} == abouts[0].suppressed_errors
+        assert {INFO: 2} == model.count_suppressed_errors(abouts)
+        expected = [u'about_resource: .\nname: test\nresource: .\ncustom_mapping: test\n']
+        assert expected == [a.dumps() for a in abouts]
+
+    def test_collect_inventory_with_min_severity_and_jobs(self):
+        test_loc = get_test_loc('test_model/rel/allAboutInOneDir')
+        errors, abouts = model.collect_inventory(test_loc, min_severity=WARNING)
+        par_errors, par_abouts = model.collect_inventory(
+            test_loc, jobs=2, min_severity=WARNING)
+        assert errors == par_errors
+        assert ([a.suppressed_errors for a in abouts]
+                == [a.suppressed_errors for a in par_abouts])
+
+    def test_collect_inventory_with_jobs_is_the_same_as_without_jobs(self):
+        test_loc = get_test_loc('test_model/rel/allAboutInOneDir')
+        errors, abouts = model.collect_inventory(test_loc)
+        par_errors, par_abouts = model.collect_inventory(test_loc, jobs=2)
+        assert errors == par_errors
+        assert [a.dumps() for a in abouts] == [a.dumps() for a in par_abouts]
+        assert ([a.about_file_path for a in abouts]
+                == [a.about_file_path for a in par_abouts])
+
+    @mock.patch.object(model.sys, 'version_info', (3, 6, 0))
+    def test_collect_inventory_with_jobs_without_a_pool_initializer(self):
+        # before Python 3.7, a process pool has no initializer argument
+        test_loc = get_test_loc('test_model/rel/allAboutInOneDir')
+        errors, abouts = model.collect_inventory(test_loc)
+        par_errors, par_abouts = model.collect_inventory(test_loc, jobs=2)
+        assert errors == par_errors
+        assert [a.dumps() for a in abouts] == [a.dumps() for a in par_abouts]
+        assert None == model.worker_path_index
+
+    def test_iter_inventory_yields_abouts_and_their_errors(self):
+        location = get_test_loc('test_model/inventory/no_about_resource_key')
+        results = model.iter_inventory(location)
+        assert not isinstance(results, list)
+        results = list(results)
+        assert 1 == len(results)
+        about, errors = results[0]
+        assert 'about/about.ABOUT' == about.about_file_path
+        expected_errors = [Error(CRITICAL, 'about/about.ABOUT: Field about_resource is required')]
+        assert expected_errors == errors
+
+    def test_iter_inventory_errors_have_code_path_and_field(self):
+        location = get_test_loc('test_model/inventory/no_about_resource_key')
+        _about, errors = list(model.iter_inventory(location))[0]
+        error = errors[0]
+        assert 'required-field' == error.code
+        assert 'about/about.ABOUT' == error.path
+        assert 'about_resource' == error.field
+        assert 'Field about_resource is required' == error.detail
+
+    def test_write_output_csv_accepts_an_iterator_of_abouts(self):
+        location = get_test_loc('test_model/inventory/basic')
+        result = get_temp_file()
+        abouts = (about for about, _errors in model.iter_inventory(location))
+        model.write_output(abouts, result, format='csv')
+        expected = get_test_loc('test_model/inventory/basic/expected.csv')
+        check_csv(expected, result)
+
+    def test_write_output_csv_with_field_names(self):
+        location = get_test_loc('test_model/inventory/basic')
+        result = get_temp_file()
+        _errors, abouts = model.collect_inventory(location)
+        field_names = ['about_resource', 'name', 'version']
+        model.write_output(abouts, result, format='csv', field_names=field_names)
+        rows = load_csv(result)
+        assert rows
+        for row in rows:
+            assert field_names == list(row.keys())
+
+    def test_save_abouts_as_csv_writes_the_same_header_as_get_field_names(self):
+        location = get_test_loc('test_model/inventory/complex')
+        result = get_temp_file()
+        _errors, abouts = model.collect_inventory(location)
+        expected = model.get_field_names(abouts)
+        model.save_abouts_as_csv(result, iter(abouts))
+        with io.open(result, encoding='utf-8') as inp:
+            header = inp.readline().strip()
+        assert ','.join(expected) == header
+
+    def test_write_output_json_is_the_same_as_json_dumps(self):
+        location = get_test_loc('test_model/inventory/complex')
+        result = get_temp_file()
+        _errors, abouts = model.collect_inventory(location)
+        model.write_output(iter(abouts), result, format='json')
+        data = [model.get_json_item(about) for about in abouts]
+        with io.open(result, encoding='utf-8') as inp:
+            assert json.dumps(data, indent=2) == inp.read()
+
+    @unittest.skipIf(util.python2, 'bz2 and xz files are not supported on Python 2')
+    def test_write_output_compressed(self):
+        location = get_test_loc('test_model/inventory/complex')
+        _errors, abouts = model.collect_inventory(location)
+        test_dir = get_temp_dir()
+        for format in ('csv', 'json'):
+            expected = os.path.join(test_dir, 'inventory.' + format)
+            model.write_output(abouts, expected, format=format)
+            with io.open(expected, encoding='utf-8', newline='') as inp:
+                expected = inp.read()
+            for extension in util.COMPRESSED_EXTENSIONS:
+                result = os.path.join(test_dir, 'inventory.' + format + extension)
+                assert [] == model.write_output(abouts, result, format=format)
+                with util.open_text_file(result, newline='') as inp:
+                    assert expected == inp.read()
+
+    def test_write_output_jsonl(self):
+        location = get_test_loc('test_model/inventory/basic')
+        result = get_temp_file()
+        _errors, abouts = model.collect_inventory(location)
+        model.write_output(abouts, result, format='jsonl')
+        expected = [model.get_json_item(about) for about in abouts]
+        with io.open(result, encoding='utf-8') as inp:
+            lines = inp.read().splitlines()
+        assert len(expected) == len(lines)
+        assert expected == [json.loads(line, object_pairs_hook=OrderedDict) for line in lines]
+
+    def test_write_output_json_with_no_about(self):
+        result = get_temp_file()
+        model.write_output([], result, format='json')
+        with io.open(result, encoding='utf-8') as inp:
+            assert '[]' == inp.read()
+
+    def test_write_output_does_not_modify_the_abouts(self):
+        location = get_test_loc('test_model/inventory/complex')
+        _errors, abouts = model.collect_inventory(location)
+        expected = [a.as_dict() for a in abouts]
+        for format in ('csv', 'json', 'jsonl'):
+            model.write_output(abouts, get_temp_file(), format=format)
+        assert expected == [a.as_dict() for a in abouts]
+        # license texts are still available for attribution
+        about = [a for a in abouts if a.about_file_path == 'about/about.ABOUT'][0]
+        assert 'Apache License' in about.license_file.value['apache-2.0.LICENSE']
+
+    def test_get_json_item_lists_each_license_file(self):
+        path = 'test_model/multiple_files.ABOUT'
+        about = model.About(get_test_loc(path), about_file_path=path)
+        expected = OrderedDict([
+            ('about_resource', '/test_model/'),
+            ('name', 'multiple_files'),
+            ('notice_file', 'NOTICE, NOTICE1'),
+            ('author_file', 'AUTHOR'),
+            ('licenses', [
+                OrderedDict([('key', 'lgpl-2.1'), ('file', 'COPYING')]),
+                OrderedDict([('file', 'COPYING.LESSER')]),
+            ]),
+        ])
+        assert expected == model.get_json_item(about)
+
+    def test_get_csv_row_joins_lists_and_keeps_file_fields_original_values(self):
+        path = 'test_model/multiple_files.ABOUT'
+        about = model.About(get_test_loc(path), about_file_path=path)
+        expected = OrderedDict([
+            ('about_resource', '/test_model/'),
+            ('name', 'multiple_files'),
+            ('license_key', 'lgpl-2.1'),
+            ('license_file', 'COPYING, COPYING.LESSER'),
+            ('notice_file', 'NOTICE, NOTICE1'),
+            ('author_file', 'AUTHOR'),
+        ])
+        assert expected == model.get_csv_row(about)
+
+    def test_get_csv_row_and_get_json_item_skip_about_without_about_resource(self):
+        about = model.About()
+        about.name.value = 'test'
+        assert None == model.get_csv_row(about)
+        assert None == model.get_json_item(about)
+
     def test_parse_license_expression(self):
         spec_char, returned_lic = model.parse_license_expression('mit or apache-2.0')
         expected_lic = ['mit', 'apache-2.0']
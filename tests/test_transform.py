@@ -19,6 +19,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
+import io
+import os
 import unittest
 
 from testing_utils import get_temp_dir
@@ -29,7 +31,9 @@ from attributecode import INFO
 from attributecode import CRITICAL
 from attributecode import Error
 from attributecode import gen
+from attributecode import util
 from attributecode.transform import read_csv_rows
+from attributecode.transform import transform_csv_to_csv
 from attributecode.transform import transform_data
 from attributecode.transform import Transformer
 
@@ -43,3 +47,24 @@ class TransformTest(unittest.TestCase):
         col_name, data, err = transform_data(rows, transformer)
         expect = [u'about_resource', u'name']
         assert col_name == expect
+
+    @unittest.skipIf(util.python2, 'bz2 and xz files are not supported on Python 2')
+    def test_transform_csv_to_csv_compressed(self):
+        configuration = get_test_loc('test_transform/configuration')
+        transformer = Transformer.from_file(configuration)
+        test_dir = get_temp_dir()
+        test_file = os.path.join(test_dir, 'input.csv')
+        with io.open(test_file, 'w', encoding='utf-8') as out:
+            out.write('Directory/Filename,Component\n/tmp/test.c,test\n')
+
+        expected_file = os.path.join(test_dir, 'expected.csv')
+        assert [] == transform_csv_to_csv(test_file, expected_file, transformer)
+        with io.open(expected_file, encoding='utf-8') as inp:
+            expected = inp.read()
+
+        compressed = os.path.join(test_dir, 'output.csv.bz2')
+        assert [] == transform_csv_to_csv(test_file, compressed, transformer)
+        result = os.path.join(test_dir, 'result.csv.xz')
+        assert [] == transform_csv_to_csv(compressed, result, transformer)
+        with util.open_text_file(result) as inp:
+            assert expected == inp.read()
@@ -19,18 +19,27 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from collections import OrderedDict
+import io
+import os
+import pickle
 import string
 import unittest
 
 import saneyaml
 
 from testing_utils import extract_test_loc
+from testing_utils import get_temp_dir
+from testing_utils import get_temp_file
 from testing_utils import get_test_loc
 from testing_utils import on_posix
 from testing_utils import on_windows
 
 from attributecode import CRITICAL
+from attributecode import ERROR
 from attributecode import Error
+from attributecode import INFO
+from attributecode import NOTSET
+from attributecode import WARNING
 from attributecode import model
 from attributecode import util
 
@@ -274,6 +283,71 @@ class TestGetLocations(unittest.TestCase):
         result = [l.partition('/about_locations/')[-1] for l in result]
         assert expected == result
 
+    def test_get_about_locations_with_workers(self):
+        test_dir = get_test_loc('test_util/about_locations')
+        expected = sorted(util.get_about_locations(test_dir))
+        result = sorted(util.get_about_locations(test_dir, workers=4))
+        assert expected == result
+
+    def test_get_about_locations_can_sort(self):
+        test_dir = get_test_loc('test_util/about_locations')
+        expected = [
+            'dir1/dir2/file1.about',
+            'dir1/file2.aBout',
+            'file with_spaces.ABOUT',
+        ]
+        result = list(util.get_about_locations(test_dir, workers=4, sort=True))
+        result = [l.partition('/about_locations/')[-1] for l in result]
+        assert expected == result
+
+    def test_bounded_map_yields_in_order_and_consumes_a_window_at_a_time(self):
+        from concurrent.futures import ThreadPoolExecutor
+        consumed = []
+
+        def items():
+            for i in range(20):
+                consumed.append(i)
+                yield i
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = util.bounded_map(executor, lambda i: i * 2, items(), 3)
+            assert 0 == next(results)
+            # the window and the next item only
+            assert 4 == len(consumed)
+            assert list(range(2, 40, 2)) == list(results)
+
+    def test_scan_about_directory_does_not_return_non_about_files(self):
+        test_dir = get_test_loc('test_util/about_locations')
+        about_locations, subdirs = util.scan_about_directory(test_dir)
+        about_locations = [l.partition('/about_locations/')[-1] for l in about_locations]
+        assert ['file with_spaces.ABOUT'] == about_locations
+        subdirs = sorted(util.resource_name(d) for d in subdirs)
+        assert ['dir1', 'dir2'] == subdirs
+
+    def test_get_about_locations_with_path_index(self):
+        test_dir = get_test_loc('test_util/about_locations')
+        path_index = util.PathIndex()
+        list(util.get_about_locations(test_dir, workers=2, path_index=path_index))
+        for dirpath, dirnames, filenames in os.walk(test_dir):
+            assert path_index.exists(dirpath)
+            for name in dirnames + filenames:
+                assert path_index.exists(os.path.join(dirpath, name))
+        assert not path_index.exists(os.path.join(test_dir, 'does-not-exist'))
+        assert not path_index.exists(os.path.join(test_dir, 'dir1', 'does-not-exist'))
+
+    def test_path_index_exists_checks_symlinks_and_unwalked_paths(self):
+        if on_windows:
+            return
+        test_dir = get_temp_dir()
+        os.symlink(os.path.join(test_dir, 'missing'), os.path.join(test_dir, 'broken'))
+        os.symlink(test_dir, os.path.join(test_dir, 'link'))
+        path_index = util.PathIndex()
+        util.scan_about_directory(test_dir, path_index)
+        assert not path_index.exists(os.path.join(test_dir, 'broken'))
+        assert path_index.exists(os.path.join(test_dir, 'link'))
+        assert path_index.exists(os.path.join(test_dir, 'link', 'link'))
+        assert path_index.exists(os.path.dirname(test_dir))
+
     def test_get_locations_can_yield_a_single_file(self):
         test_file = get_test_loc('test_util/about_locations/file with_spaces.ABOUT')
         result = list(util.get_locations(test_file))
@@ -299,6 +373,22 @@ class TestGetLocations(unittest.TestCase):
         assert any(longpath in r for r in result)
 
 
+def compress_file(location, extension):
+    """
+    Return the location of a new temporary copy of the file at `location`
+    compressed with the codec of the `extension` compressed file extension.
+    """
+    import bz2
+    import gzip
+    import lzma
+    openers = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+    compressed = os.path.join(get_temp_dir(), os.path.basename(location) + extension)
+    with open(location, 'rb') as inp:
+        with openers[extension](compressed, 'wb') as out:
+            out.write(inp.read())
+    return compressed
+
+
 class TestCsv(unittest.TestCase):
 
     def test_load_csv_without_mapping(self):
@@ -334,23 +424,53 @@ class TestCsv(unittest.TestCase):
         result = util.load_csv(test_file)
         assert expected == result
 
-    def test_format_about_dict_for_csv_output(self):
-        about = [OrderedDict([
-            (u'about_file_path', u'/input/about1.ABOUT'),
-            (u'about_resource', [u'test.c']),
-            (u'name', u'AboutCode-toolkit'),
-            (u'license_expression', u'mit AND bsd-new'),
-            (u'license_key', [u'mit', u'bsd-new'])])]
-
+    def test_CsvRows_reads_the_columns_and_rows_on_each_iteration(self):
+        test_file = get_test_loc('test_util/csv/about_key_with_upper_case.csv')
+        rows = util.CsvRows(test_file)
+        assert None == rows.columns
+        expected = util.load_csv(test_file)
+        assert expected == list(rows)
+        assert 'about_file' in rows.columns[0].lower()
+        assert expected == list(rows)
+
+    def test_CsvRows_fills_short_rows_and_skips_empty_lines(self):
+        test_file = get_temp_file('short.csv')
+        with open(test_file, 'w') as csv_file:
+            csv_file.write('about_resource,Name,version\n\n.,ABOUT tool\n')
         expected = [OrderedDict([
-            (u'about_file_path', u'/input/about1.ABOUT'),
-            (u'about_resource', u'test.c'),
-            (u'name', u'AboutCode-toolkit'),
-            (u'license_expression', u'mit AND bsd-new'),
-            (u'license_key', u'mit\nbsd-new')])]
-
-        output = util.format_about_dict_for_csv_output(about)
-        assert output == expected
+            ('about_resource', '.'),
+            ('name', 'ABOUT tool'),
+            ('version', None)])
+        ]
+        assert expected == list(util.CsvRows(test_file))
+
+    def test_CsvRows_reports_invalid_utf8_and_long_rows(self):
+        test_file = get_temp_file('bad.csv')
+        with open(test_file, 'wb') as csv_file:
+            csv_file.write(b'about_resource,name\n'
+                           b'.,caf\xe9\n'
+                           b'a.c,a,extra\n')
+        rows = util.CsvRows(test_file)
+        result = list(rows)
+        assert u'caf\ufffd' == result[0]['name']
+        assert OrderedDict([('about_resource', 'a.c'), ('name', 'a')]) == result[1]
+        expected = [
+            Error(CRITICAL, 'Line 2 of %s is not valid UTF-8 text.' % test_file),
+            Error(CRITICAL, 'Line 3 of %s has 3 values but there are only '
+                            '2 columns: the extra values are ignored.' % test_file),
+        ]
+        assert expected == rows.errors
+        # the errors are reset on each iteration
+        list(rows)
+        assert expected == rows.errors
+
+    @unittest.skipIf(util.python2, 'bz2 and xz files are not supported on Python 2')
+    def test_load_csv_compressed(self):
+        test_file = get_test_loc('test_gen/inv4.csv')
+        expected = util.load_csv(test_file)
+        for extension in util.COMPRESSED_EXTENSIONS:
+            result = util.load_csv(compress_file(test_file, extension))
+            assert expected == result
 
 
 class TestJson(unittest.TestCase):
@@ -460,27 +580,252 @@ class TestJson(unittest.TestCase):
         result = util.load_json(test_file)
         assert expected == result
 
-    def test_format_about_dict_for_json_output(self):
-        about = [OrderedDict([
-            (u'about_file_path', u'/input/about1.ABOUT'),
-            (u'about_resource', OrderedDict([(u'test.c', None)])),
-            (u'name', u'AboutCode-toolkit'),
-            (u'license_key', [u'mit', u'bsd-new'])])]
+    def test_load_json_keeps_the_order_of_a_list(self):
+        test_file = os.path.join(get_temp_dir(), 'inventory.json')
+        with io.open(test_file, 'w', encoding='utf-8') as out:
+            out.write('[{"about_resource": "/b", "name": "b"}, '
+                      '{"about_resource": "/a", "name": "a"}]')
+        result = util.load_json(test_file)
+        assert ['b', 'a'] == [item['name'] for item in result]
 
-        expected = [OrderedDict([
-            (u'about_file_path', u'/input/about1.ABOUT'),
-            (u'about_resource', u'test.c'),
-            (u'name', u'AboutCode-toolkit'),
-            (u'licenses', [
-                OrderedDict([(u'key', u'mit')]),
-                OrderedDict([(u'key', u'bsd-new')])])])]
+    @unittest.skipIf(util.python2, 'bz2 and xz files are not supported on Python 2')
+    def test_load_json_compressed(self):
+        test_file = get_test_loc('test_util/json/expected.json')
+        expected = util.load_json(test_file)
+        for extension in util.COMPRESSED_EXTENSIONS:
+            result = util.load_json(compress_file(test_file, extension))
+            assert expected == result
 
-        output = util.format_about_dict_for_json_output(about)
-        assert output == expected
+
+def load_about_with_saneyaml(text):
+    text = util.normalize_about_text(text)
+    return saneyaml.load(text, allow_duplicate_keys=False)
+
+
+class TestFastLoadAbout(unittest.TestCase):
+
+    def check_fast_load_about(self, text):
+        result = util.fast_load_about(text)
+        if result is None:
+            return False
+        expected = load_about_with_saneyaml(text)
+        assert list(expected.items()) == list(result.items())
+        return True
+
+    def test_fast_load_about_is_the_same_as_saneyaml_on_all_test_about_files(self):
+        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        loaded = 0
+        for sub_dir in ('tests/testdata', 'thirdparty', 'etc'):
+            for loc in util.get_about_locations(os.path.join(root_dir, sub_dir)):
+                try:
+                    with io.open(loc, encoding='utf-8') as inp:
+                        text = inp.read()
+                except UnicodeDecodeError:
+                    continue
+                if self.check_fast_load_about(text):
+                    loaded += 1
+        # most of the test ABOUT files should use the fast loader
+        assert loaded > 100
+
+    def test_fast_load_about_with_literal_block_and_licenses(self):
+        test = (
+            'about_resource: .\n'
+            'name: test\n'
+            'redistribute: yes\n'
+            'track_changes: no\n'
+            'description: |\n'
+            '    some\n'
+            '\n'
+            '      text\n'
+            '\n'
+            'licenses:\n'
+            '  - key: mit\n'
+            '    name: MIT License\n'
+            '  - key: apache-2.0\n'
+            'notes: 2019-10-02\n'
+        )
+        assert self.check_fast_load_about(test)
+        result = util.fast_load_about(test)
+        assert 'some\n\n  text\n' == result['description']
+        assert 'yes' == result['redistribute']
+        assert False is result['track_changes']
+        expected = [
+            OrderedDict([('key', 'mit'), ('name', 'MIT License')]),
+            OrderedDict([('key', 'apache-2.0')]),
+        ]
+        assert expected == result['licenses']
+
+    def test_fast_load_about_returns_none_for_unsupported_yaml(self):
+        tests = [
+            'name: test\nname: dupe\n',
+            'name: test\nnotes: some\n  continuation\n',
+            'name: test\nnotes: >\n  folded\n',
+            'name: "quoted"\n',
+            'name: test # comment\n',
+            'name: test\nowner:\n  nested: mapping\n',
+            '# only a comment\n',
+        ]
+        for test in tests:
+            assert None == util.fast_load_about(test)
+
+    def test_fast_load_about_leaves_merge_keys_to_saneyaml(self):
+        tests = [
+            'name: test\n<<: foo\n',
+            'name: test\n<< : foo\n',
+            'name: test\nlicenses:\n  - <<: x\n    key: mit\n',
+            'name: test\nlicenses:\n  - key: mit\n    <<: x\n',
+            'name: a << b\n',
+        ]
+        for test in tests:
+            assert None == util.fast_load_about(test)
+            # the same text is loaded the same way by the fallback only
+            assert not self.check_fast_load_about(test)
+
+
+class TestNormalizeAboutText(unittest.TestCase):
+
+    def test_wrap_boolean_value(self):
+        test = 'name: test\nredistribute:  yes \nattribute\n\ntrack_change:\n'
+        expected = 'name: test\nredistribute: "yes"\nattribute: ""\n\ntrack_change: ""\n'
+        assert expected == util.wrap_boolean_value(test)
+
+    def test_replace_tab_with_spaces(self):
+        test = 'name: test\r\ndescription: |\n\tsome\ttext'
+        expected = 'name: test\ndescription: |\n    some    text\n'
+        assert expected == util.replace_tab_with_spaces(test)
+
+    def test_normalize_about_text_is_the_same_as_wrap_and_replace_tabs(self):
+        tests = [
+            '',
+            '\n',
+            'name: test',
+            'name:\ttest\nmodified:\tno\t\ninternal_use_only: "yes"\r\n',
+            'description: |\n\tredistribute: yes\n\t\tmore\n\x0cattribute:\tx',
+            'modified\nredistribute:yes:no\n  attribute: yes\n',
+        ]
+        for test in tests:
+            expected = util.replace_tab_with_spaces(util.wrap_boolean_value(test))
+            assert expected == util.normalize_about_text(test)
+
+
+class TestBoundedCache(unittest.TestCase):
+
+    def test_bounded_cache_computes_missing_values_once(self):
+        cache = util.BoundedCache(max_size=10)
+        assert 'A' == cache.get_or_compute('a', lambda k: k.upper())
+        assert 'A' == cache.get_or_compute('a', lambda k: 'not called')
+        assert 'B' == cache.get_or_compute('b', lambda k: k.upper())
+        assert OrderedDict([('a', 'A'), ('b', 'B')]) == cache.items
+
+    def test_bounded_cache_evicts_oldest_items(self):
+        cache = util.BoundedCache(max_size=2)
+        for key in 'abc':
+            cache.get_or_compute(key, lambda k: k)
+        assert ['b', 'c'] == list(cache.items)
+        cache.clear()
+        assert not cache.items
+
+
+class TestErrorFilter(unittest.TestCase):
+
+    def test_error_filter_counts_errors_below_min_severity(self):
+        error_filter = util.ErrorFilter(min_severity=WARNING)
+        assert error_filter.reports(CRITICAL)
+        assert error_filter.reports(WARNING)
+        assert not error_filter.reports(INFO)
+        assert not error_filter.reports(INFO)
+        assert {INFO: 2} == error_filter.suppressed
+
+    def test_is_reported_without_error_filter_reports_all(self):
+        assert util.is_reported(NOTSET)
+        assert util.is_reported(INFO, util.ErrorFilter())
+        assert not util.is_reported(INFO, util.ErrorFilter(ERROR))
+
+
+class TestErrorSummary(unittest.TestCase):
+
+    def test_error_summary_groups_errors_by_code_and_field(self):
+        errors = [
+            Error(INFO, 'a.ABOUT: Field x is a custom field.',
+                  code='custom-field', path='a.ABOUT', field='x'),
+            Error(INFO, 'b.ABOUT: Field x is a custom field.',
+                  code='custom-field', path='b.ABOUT', field='x'),
+            Error(INFO, 'b.ABOUT: Field y is a custom field.',
+                  code='custom-field', path='b.ABOUT', field='y'),
+            Error(CRITICAL, 'a.ABOUT: boom', path='a.ABOUT'),
+            Error(CRITICAL, 'b.ABOUT: boom', path='b.ABOUT'),
+        ]
+        summary = util.ErrorSummary(errors)
+        expected = [(errors[0], 2), (errors[2], 1), (errors[3], 2)]
+        assert expected == list(summary)
+        assert 3 == len(summary)
+        assert 5 == summary.count()
+        assert 2 == summary.count(WARNING)
+
+    def test_error_summary_counts_duplicated_errors_once(self):
+        errors = [
+            Error(INFO, 'a.ABOUT: Field x is a custom field.',
+                  code='custom-field', path='a.ABOUT', field='x'),
+            Error(INFO, 'a.ABOUT: Field x is a custom field.',
+                  code='custom-field', path='a.ABOUT', field='x'),
+            Error(CRITICAL, 'a.ABOUT: boom', path='a.ABOUT'),
+            Error(CRITICAL, 'a.ABOUT: boom', path='a.ABOUT'),
+        ]
+        summary = util.ErrorSummary()
+        summary.extend(errors)
+        assert [(errors[0], 1), (errors[2], 1)] == list(summary)
+        assert len(util.unique(errors)) == summary.count()
+
+    def test_error_structured_data_is_not_part_of_equality(self):
+        error = Error(INFO, 'a.ABOUT: Field x is a custom field.',
+                      code='custom-field', path='a.ABOUT', field='x')
+        assert Error(INFO, 'a.ABOUT: Field x is a custom field.') == error
+        assert 'Field x is a custom field.' == error.detail
+        expected = OrderedDict([
+            ('severity', 'INFO'),
+            ('code', 'custom-field'),
+            ('path', 'a.ABOUT'),
+            ('field', 'x'),
+            ('message', 'Field x is a custom field.'),
+        ])
+        assert expected == error.to_record()
+        assert None == Error(INFO, 'msg').code
+
+
+    def test_error_has_no_instance_dict_and_unpacks_as_a_pair(self):
+        error = Error(INFO, 'a.ABOUT: Field x is a custom field.',
+                      code='custom-field', path='a.ABOUT', field='x')
+        assert not hasattr(error, '__dict__')
+        severity, message = error
+        assert INFO == severity
+        assert 'a.ABOUT: Field x is a custom field.' == message
+        assert OrderedDict([('severity', INFO), ('message', message)]) == error.to_dict()
+
+        unpickled = pickle.loads(pickle.dumps(error, protocol=2))
+        assert error == unpickled
+        assert ('custom-field', 'a.ABOUT', 'x') == (
+            unpickled.code, unpickled.path, unpickled.field)
 
 
 class TestMiscUtils(unittest.TestCase):
 
+    def test_strip_compression(self):
+        assert 'inv.csv' == util.strip_compression('inv.csv.gz')
+        assert 'inv.json' == util.strip_compression('inv.json.XZ')
+        assert 'inv.csv' == util.strip_compression('inv.csv.bz2')
+        assert 'inv.csv' == util.strip_compression('inv.csv')
+        assert util.get_compression('inv.csv') is None
+
+    def test_open_text_file_writes_and_reads_gzip_files(self):
+        import gzip
+        test_file = os.path.join(get_temp_dir(), 'test.txt.gz')
+        with util.open_text_file(test_file, 'w') as out:
+            out.write('some text \u00e9')
+        with gzip.open(test_file, 'rb') as inp:
+            assert 'some text \u00e9'.encode('utf-8') == inp.read()
+        with util.open_text_file(test_file) as inp:
+            assert 'some text \u00e9' == inp.read()
+
     def test_load_yaml_about_file_with_no_dupe(self):
         test = '''
 name: test
@@ -573,6 +918,27 @@ description: sample
         results = util.unique(items)
         assert expected == results
 
+    def test_Error_equality_and_hash(self):
+        error = Error(CRITICAL, "some 'message'")
+        same = Error(CRITICAL, "some 'message'")
+        assert error == same
+        assert hash(error) == hash(same)
+        assert not error != same
+        assert error != Error(INFO, "some 'message'")
+        assert error != (CRITICAL, "some 'message'")
+        assert 1 == len(set([error, same]))
+
+    def test_unique_with_errors_and_unhashable_items(self):
+        items = [
+            Error(CRITICAL, 'a'),
+            ['unhashable'],
+            Error(INFO, 'a'),
+            Error(CRITICAL, 'a'),
+            ['unhashable'],
+        ]
+        expected = [Error(CRITICAL, 'a'), ['unhashable'], Error(INFO, 'a')]
+        assert expected == util.unique(items)
+
     def test_unique_can_handle_About_object(self):
         base_dir = 'some_dir'
         test = {